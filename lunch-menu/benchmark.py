@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from itertools import islice
+
+import numpy as np
+
+import lunch_menu as lm
+
+# (low, high) of the values the synthetic meals are drawn from, nutrients per 100 g
+NUTRIENT_RANGES = {
+    'calories': (20, 450),
+    'protein': (0.0, 30.0),
+    'fat': (0.0, 25.0),
+    'carbs': (0.0, 60.0),
+    'amount': (80, 400),
+    'price': (0.3, 4.0),
+}
+
+DISTRIBUTIONS = {
+    'uniform': lambda rnd, low, high: rnd.uniform(low, high),
+    'normal': lambda rnd, low, high: min(max(rnd.gauss((low + high) / 2, (high - low) / 6), low), high),
+    'skewed': lambda rnd, low, high: low + (high - low) * rnd.betavariate(1.5, 5),
+}
+
+
+def make_menu(items: int, distribution: str = 'uniform', seed: int = 0):
+    """Synthetic meals in the format of load_meals
+
+    :param items: number of meals in every category
+    :param distribution: name in DISTRIBUTIONS the nutrient values are drawn from
+    :param seed: random seed
+    :return: pandas dataframe with meal, category, calories, protein, fat, carbs, amount and price columns
+    """
+    import pandas as pd
+
+    rnd = random.Random(seed)
+    draw = DISTRIBUTIONS[distribution]
+    meals = list()
+    for category in lm.MEAL_CATEGORIES:
+        for i in range(items):
+            meal = {'meal': '{} {}'.format(category, i), 'category': category}
+            for name, (low, high) in NUTRIENT_RANGES.items():
+                value = draw(rnd, low, high)
+                meal[name] = int(value) if isinstance(low, int) else round(value, 2)
+            meals.append(meal)
+    rnd.shuffle(meals)
+    return pd.DataFrame(meals)
+
+
+def make_intervals(meals, tightness: float = 0.5, seed: int = 0, samples: int = 2000) -> dict:
+    """Limits around the typical lunch of the menu, narrower with higher tightness
+
+    :param meals: pandas dataframe from make_menu or load_meals
+    :param tightness: 0 accepts almost every lunch, values close to 1 only a few
+    :param seed: random seed of the sampled lunches
+    :param samples: number of random lunches the limits are derived from
+    :return: dictionary with limit requirements accepted by check_intervals
+    """
+    rnd = np.random.default_rng(seed)
+    stats = [lm.get_meal_stats(category) for category in lm.split_into_categories(meals)]
+    totals = sum(s[rnd.integers(len(s), size=samples)] for s in stats)
+    low, high = np.quantile(totals, [tightness / 2, 1 - tightness / 2], axis=0)
+
+    intervals = {name: (int(np.floor(low[i])), int(np.ceil(high[i]))) for i, name in enumerate(lm.STAT_NAMES[:-1])}
+    intervals['price'] = (0.0, round(float(np.quantile(totals[:, -1], 1 - tightness * 0.9)), 2))
+    return intervals
+
+
+def measure(func, repeat: int = 1) -> dict:
+    """Best wall time over repeat runs, then peak traced memory of one more run
+
+    :param func: function without arguments
+    :param repeat: number of timed runs
+    :return: dictionary with seconds, peak_mib and the result of the last run
+    """
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'seconds': seconds, 'peak_mib': peak / 2 ** 20, 'result': result}
+
+
+def same_lunch(first, second) -> bool:
+    """Compares two results of find_best_meal by meal names and price
+
+    :param first: (lunch, price) tuple
+    :param second: (lunch, price) tuple
+    :return: True if both found the same lunch
+    """
+    (lunch, price), (other, other_price) = first, second
+    names = None if lunch is None else [meal.meal for meal in lunch]
+    other_names = None if other is None else [meal.meal for meal in other]
+    return names == other_names and price == other_price
+
+
+def run_case(items, distribution, tightness, seed=0, repeat=1, sample=2000, max_brute=200000, solvers=None) -> list:
+    """Times the lunch_menu stages and solvers on one synthetic menu
+
+    :param items: number of meals in every category
+    :param distribution: name in DISTRIBUTIONS
+    :param tightness: interval tightness, see make_intervals
+    :param seed: random seed
+    :param repeat: number of timed runs of every stage
+    :param sample: number of lunches evaluate_lunch is timed on
+    :param max_brute: largest number of combinations generate_combinations and find_best_meal are run on
+    :param solvers: names in SOLVERS to compare, all if None
+    :return: list of dictionaries, one per stage or solver, solvers are checked against brute
+     or vectorized when brute is skipped
+    """
+    meals = make_menu(items, distribution, seed)
+    intervals = make_intervals(meals, tightness, seed)
+    combinations = items ** len(lm.MEAL_CATEGORIES)
+    case = {'items': items, 'distribution': distribution, 'tightness': tightness, 'combinations': combinations}
+    rows = list()
+
+    def record(stage, measured, count=None, **extra):
+        row = dict(case, stage=stage, seconds=measured['seconds'], peak_mib=measured['peak_mib'],
+                   per_second=count / measured['seconds'] if count and measured['seconds'] else None, **extra)
+        rows.append(row)
+        return measured['result']
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'meals.csv')
+        meals.to_csv(path, index=False)
+        loaded = record('load_meals', measure(lambda: lm.load_meals(path), repeat), len(meals))
+
+    categories = record('split_into_categories', measure(lambda: lm.split_into_categories(loaded), repeat), len(meals))
+    if combinations <= max_brute:
+        record('generate_combinations', measure(lambda: lm.generate_combinations(*categories), repeat), combinations)
+
+    lunches = list(islice(lm.iter_combinations(*categories), sample))
+    record('evaluate_lunch', measure(lambda: [lm.evaluate_lunch(*lunch, intervals) for lunch in lunches], repeat),
+           len(lunches))
+
+    reference_name = 'brute' if combinations <= max_brute else 'vectorized'
+    reference = None
+    for name in solvers or lm.SOLVERS:
+        if name == 'brute' and combinations > max_brute:
+            continue
+        result = record('solver ' + name, measure(lambda: lm.SOLVERS[name](*categories, intervals), repeat),
+                        combinations)
+        if name == reference_name:
+            reference = result
+        rows[-1]['price'] = result[1]
+        rows[-1]['result'] = result
+    if reference is None:
+        reference = lm.SOLVERS[reference_name](*categories, intervals)
+
+    for row in rows:
+        if 'result' in row:
+            result = row.pop('result')
+            # the reference is not reported as its own check
+            reference_row = row['stage'] == 'solver ' + reference_name
+            row['correct'] = None if reference_row else same_lunch(result, reference)
+            row['reference'] = reference_name
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaling of lunch_menu stages and solvers on synthetic menus')
+    parser.add_argument('--items', type=int, nargs='+', default=[3, 6, 10, 20], help='meals per category')
+    parser.add_argument('--distribution', choices=sorted(DISTRIBUTIONS), nargs='+', default=['uniform'])
+    parser.add_argument('--tightness', type=float, nargs='+', default=[0.2, 0.6])
+    parser.add_argument('--solvers', choices=sorted(lm.SOLVERS), nargs='+', default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--sample', type=int, default=2000, help='lunches evaluate_lunch is timed on')
+    parser.add_argument('--max-brute', type=int, default=200000,
+                        help='largest number of combinations generate_combinations and find_best_meal are run on')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='also write the results to this json file')
+    args = parser.parse_args()
+
+    results = list()
+    print('{:>6}{:>13}{:>7}  {:<24}{:>11}{:>15}{:>11}{:>9}'.format(
+        'items', 'distribution', 'tight', 'stage', 'ms', 'per second', 'peak MiB', 'correct'))
+    for items in args.items:
+        for distribution in args.distribution:
+            for tightness in args.tightness:
+                for row in run_case(items, distribution, tightness, args.seed, args.repeat, args.sample,
+                                    args.max_brute, args.solvers):
+                    results.append(row)
+                    print('{:>6}{:>13}{:>7}  {:<24}{:>11.2f}{:>15}{:>11.2f}{:>9}'.format(
+                        items, distribution, tightness, row['stage'], row['seconds'] * 1000,
+                        '-' if row['per_second'] is None else '{:.0f}'.format(row['per_second']),
+                        row['peak_mib'], '-' if row.get('correct') is None else str(row['correct'])))
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
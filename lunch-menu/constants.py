@@ -1,7 +1,36 @@
+from collections.abc import Sequence
 from copy import deepcopy
 import pickle
 
-import pandas as pd
+
+class _LazyFixture(Sequence):
+    """List of sample fixtures that is only unpickled on first access"""
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._items = None
+
+    def _load(self):
+        if self._items is None:
+            self._items = list(self._loader())
+        return self._items
+
+    def __getitem__(self, index):
+        return self._load()[index]
+
+    def __len__(self):
+        return len(self._load())
+
+
+def _read_pickle(path):
+    with open(path, 'rb') as fixture:
+        return pickle.load(fixture)
+
+
+def _read_dataframes(paths):
+    import pandas as pd
+
+    return [pd.read_pickle(path) for path in paths]
 
 
 DATASETS = [
@@ -20,18 +49,18 @@ INTERVALS = [
 ]
 DSET_LENGTH = 12
 
-DFRAMES = [
-    pd.read_pickle("1a_samples\\dset1.pkl"),
-    pd.read_pickle("1a_samples\\dset2.pkl"),
-    pd.read_pickle("1a_samples\\dset3.pkl"),
-    pd.read_pickle("1a_samples\\dset4.pkl"),
-    pd.read_pickle("1a_samples\\dset5.pkl")
-]
+DFRAMES = _LazyFixture(lambda: _read_dataframes([
+    "1a_samples\\dset1.pkl",
+    "1a_samples\\dset2.pkl",
+    "1a_samples\\dset3.pkl",
+    "1a_samples\\dset4.pkl",
+    "1a_samples\\dset5.pkl"
+]))
 
-LOADED_INTERVALS = [
-    pickle.load(open('1a_samples\\intervals{}.pkl'.format(f), 'rb'))
+LOADED_INTERVALS = _LazyFixture(lambda: (
+    _read_pickle('1a_samples\\intervals{}.pkl'.format(f))
     for f in range(1, 6)
-]
+))
 INTERVALS_KEYS_AND_TYPES = [
     ('calories', int),
     ('protein', int),
@@ -39,48 +68,51 @@ INTERVALS_KEYS_AND_TYPES = [
     ('carbs', int),
     ('price', float)
 ]
-MISSING_KEY_INTERVALS = deepcopy(LOADED_INTERVALS[0])
+# the invalid intervals are derived from the first sample only, which is
+# the only fixture read at import time
+_FIRST_INTERVALS = _read_pickle('1a_samples\\intervals1.pkl')
+MISSING_KEY_INTERVALS = deepcopy(_FIRST_INTERVALS)
 del MISSING_KEY_INTERVALS['protein']
-NON_TUPLE_INTERVALS = deepcopy(LOADED_INTERVALS[0])
+NON_TUPLE_INTERVALS = deepcopy(_FIRST_INTERVALS)
 NON_TUPLE_INTERVALS['carbs'] = [5, 300]
-SHORT_TUPLE_INTERVALS = deepcopy(LOADED_INTERVALS[0])
+SHORT_TUPLE_INTERVALS = deepcopy(_FIRST_INTERVALS)
 SHORT_TUPLE_INTERVALS['price'] = (5.0, )
-WRONG_TYPE_INTERVALS = deepcopy(LOADED_INTERVALS[0])
+WRONG_TYPE_INTERVALS = deepcopy(_FIRST_INTERVALS)
 WRONG_TYPE_INTERVALS['protein'] = (5.0, 300.0)
-WRONG_LIMIT_INTERVALS = deepcopy(LOADED_INTERVALS[0])
+WRONG_LIMIT_INTERVALS = deepcopy(_FIRST_INTERVALS)
 WRONG_LIMIT_INTERVALS['calories'] = (300, 5)
 
-MEAL_STATS = [
-    pickle.load(open('1a_samples\\meal_stats{}.pkl'.format(f), 'rb'))
+MEAL_STATS = _LazyFixture(lambda: (
+    _read_pickle('1a_samples\\meal_stats{}.pkl'.format(f))
     for f in range(1, 6)
-]
+))
 
-EVALUATE_EXAMPLES = pickle.load(open('1a_samples\\evaluations.pkl', 'rb'))
+EVALUATE_EXAMPLES = _LazyFixture(lambda: _read_pickle('1a_samples\\evaluations.pkl'))
 
-PRICES = pickle.load(open('1a_samples\\prices.pkl', 'rb'))
+PRICES = _LazyFixture(lambda: _read_pickle('1a_samples\\prices.pkl'))
 
-SOUPS = [
-    pickle.load(open('1a_samples\\soups{}.pkl'.format(f), 'rb'))
+SOUPS = _LazyFixture(lambda: (
+    _read_pickle('1a_samples\\soups{}.pkl'.format(f))
     for f in range(1, 6)
-]
-MAINS = [
-    pickle.load(open('1a_samples\\mains{}.pkl'.format(f), 'rb'))
+))
+MAINS = _LazyFixture(lambda: (
+    _read_pickle('1a_samples\\mains{}.pkl'.format(f))
     for f in range(1, 6)
-]
-SIDES = [
-    pickle.load(open('1a_samples\\sides{}.pkl'.format(f), 'rb'))
+))
+SIDES = _LazyFixture(lambda: (
+    _read_pickle('1a_samples\\sides{}.pkl'.format(f))
     for f in range(1, 6)
-]
-DESSERTS = [
-    pickle.load(open('1a_samples\\desserts{}.pkl'.format(f), 'rb'))
+))
+DESSERTS = _LazyFixture(lambda: (
+    _read_pickle('1a_samples\\desserts{}.pkl'.format(f))
     for f in range(1, 6)
-]
-COMBINATIONS = [
-    pickle.load(open('1a_samples\\combinations{}.pkl'.format(f), 'rb'))
+))
+COMBINATIONS = _LazyFixture(lambda: (
+    _read_pickle('1a_samples\\combinations{}.pkl'.format(f))
     for f in range(1, 6)
-]
-COMBINATION_NAMES = [
+))
+COMBINATION_NAMES = _LazyFixture(lambda: (
     [(s.meal, m.meal, si.meal, d.meal) for (s, m, si, d) in ex_list] for ex_list in COMBINATIONS
-]
+))
 
-FIND_BEST_EXAMPLES = pickle.load(open('1a_samples\\find_best_examples.pkl', 'rb'))
+FIND_BEST_EXAMPLES = _LazyFixture(lambda: _read_pickle('1a_samples\\find_best_examples.pkl'))
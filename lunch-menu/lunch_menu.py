@@ -1,5 +1,30 @@
-import pandas as pd
-from itertools import combinations
+import csv
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+
+MEAL_CATEGORIES = ['soup', 'main dish', 'sidedish', 'dessert']
+STAT_NAMES = ['calories', 'protein', 'fat', 'carbs', 'price']
+# per-serving columns attached by split_into_categories, price is already per serving
+SERVING_NAMES = ['serving_calories', 'serving_protein', 'serving_fat', 'serving_carbs']
+CHUNK_SIZE = 2 ** 18
+# lunch totals are rounded to 3 decimals before being checked against the
+# limits, so bounds on partial lunches are only trusted beyond this margin
+ROUNDING_SLACK = 1e-3
+LOAD_CHUNK_SIZE = 100000
+# directory created next to a meal file by load_menu_cached
+MENU_CACHE_DIR = '.menu_cache'
+# strings pd.read_csv reads as missing values by default
+NA_VALUES = frozenset(['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                       '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'])
 
 
 def load_meals(file_path):
@@ -8,6 +33,8 @@ def load_meals(file_path):
     :param file_path: csv file
     :return: dataframe of file if can read it otherwise return -1
     """
+    import pandas as pd
+
     try:
         meals = pd.read_csv(file_path)
     except (FileNotFoundError, ValueError, TypeError):
@@ -17,19 +44,90 @@ def load_meals(file_path):
     return meals
 
 
+def load_meals_chunked(file_path, chunk_size=LOAD_CHUNK_SIZE, nutrient_dtype='float32'):
+    """Loads a large csv file in chunks and splits it into categories while reading,
+    so the whole unsplit file is never held in memory. Nutrient columns and amount
+    are stored as nutrient_dtype and category as a pandas categorical
+
+    :param file_path: csv file
+    :param chunk_size: number of rows read at once
+    :param nutrient_dtype: dtype of the nutrient and amount columns, float64 gives the same values as load_meals
+    :return: four dataframes like split_into_categories if can read it otherwise return -1
+    """
+    import pandas as pd
+
+    dtypes = {name: nutrient_dtype for name in STAT_NAMES[:-1] + ['amount']}
+    dtypes.update(category=pd.CategoricalDtype(MEAL_CATEGORIES), price='float64')
+    parts = [list() for _ in MEAL_CATEGORIES]
+
+    try:
+        for chunk in pd.read_csv(file_path, dtype=dtypes, chunksize=chunk_size):
+            chunk.fillna({name: 0 for name in STAT_NAMES + ['amount']}, inplace=True)
+            for category, part in zip(MEAL_CATEGORIES, parts):
+                part.append(chunk[chunk.category == category])
+    except (FileNotFoundError, ValueError, TypeError):
+        return -1
+
+    if not parts[0]:
+        return -1
+    return tuple(add_serving_stats(pd.concat(part, ignore_index=True)) for part in parts)
+
+
+def _parse_column(values):
+    # ints if every value is integral, floats otherwise, missing values become 0
+    # like pd.read_csv and fillna(0) turn them - a column with missing values is float
+    missing = [value in NA_VALUES for value in values]
+    values = ['0' if miss else value for value, miss in zip(values, missing)]
+    if not any(missing):
+        try:
+            return np.array([int(value) for value in values], dtype=np.int64)
+        except ValueError:
+            pass
+    return np.array([float(value) for value in values], dtype=np.float64)
+
+
+def load_menu(file_path):
+    """Loads csv file from file_path straight into a Menu with the csv module,
+    without importing pandas
+
+    :param file_path: csv file
+    :return: Menu if can read the file otherwise return -1
+    """
+    try:
+        with open(file_path, newline='') as meal_file:
+            reader = csv.reader(meal_file)
+            header = next(reader)
+            rows = [dict(zip(header, row)) for row in reader if row]
+    except (FileNotFoundError, StopIteration, TypeError):
+        return -1
+
+    categories = list()
+    for category in MEAL_CATEGORIES:
+        meals = [row for row in rows if row.get('category') == category]
+        columns = dict()
+        for name in header:
+            values = [meal[name] for meal in meals]
+            columns[name] = _parse_column(values) if name in STAT_NAMES + ['amount'] else np.array(values, dtype=object)
+        categories.append(columns)
+
+    return Menu(*categories)
+
+
 def split_into_categories(meal_list):
     """Splits meals into dataframes
 
     :param meal_list: list with different types of meals: soups, main dishes, sidedishes and desserts
     :return: four dataframes
     """
+    import pandas as pd
+
     if not isinstance(meal_list, pd.DataFrame):
         return -1
 
-    meal_categories = ['soup', 'main dish', 'sidedish', 'dessert']
     try:
         sorted_meals = tuple(
-            meal_list[meal_list.category == category].reset_index(drop=True) for category in meal_categories
+            add_serving_stats(meal_list[meal_list.category == category].reset_index(drop=True))
+            for category in MEAL_CATEGORIES
         )
     except AttributeError:
         return -1
@@ -37,79 +135,154 @@ def split_into_categories(meal_list):
     return sorted_meals
 
 
+def add_serving_stats(meals):
+    """Attaches per-serving calories, protein, fat and carbs columns (see SERVING_NAMES)
+    so that calculate_stats and the search functions do not recompute them
+
+    :param meals: pandas dataframe with meals
+    :return: the dataframe with the per-serving columns added, unchanged if it lacks the needed columns
+    """
+    if not set(STAT_NAMES[:-1] + ['amount']).issubset(meals.columns):
+        return meals
+
+    for name, serving_name in zip(STAT_NAMES, SERVING_NAMES):
+        meals[serving_name] = meals[name] * meals['amount'] / 100
+    return meals
+
+
 def check_intervals(intervals):
-    # checks the validity of the loaded intervals
+    # checks the validity of the loaded intervals without pandas, the checks
+    # run in the original order so the same error wins when several limits are invalid
     # raises TypeError if intervals is not a dictionary
     if not isinstance(intervals, dict):
         raise TypeError("Intervals must be loaded as dictionary")
 
     # raises KeyError if one limit name is missing
     #     should contain calories, protein, fat, carbs and price
-    names = ['calories', 'protein', 'fat', 'carbs', 'price']
-    for key in names:
-        if key not in intervals.keys():
+    for key in STAT_NAMES:
+        if key not in intervals:
             raise KeyError("Missing expected key {}".format(key))
 
     # raises TypeError if interval limits are not given as tuples
-    for key in intervals.values():
-        if type(key) not in [tuple]:
+    for values in intervals.values():
+        if type(values) is not tuple:
             raise TypeError("Interval limits should be loaded as tuples")
 
     # raises ValueError if interval limits are not given as tuples of two
-    for key in intervals.keys():
-        if len(intervals[key]) != 2:
+    for values in intervals.values():
+        if len(values) != 2:
             raise ValueError("Interval limits should be loaded as tuples of two values")
 
-    # raises TypeError if interval limit values are not of the correct type
-    #     float for price, int for others
-    for key, values in intervals.items():
-        if key == 'price':
-            if type(values[0]) not in [float] and type(values[1]) not in [float]:
-                raise TypeError("{} limits should be set as float".format(key))
-        else:
-            if type(values[0]) not in [int] and type(values[1]) not in [int]:
-                raise TypeError("{} limits should be set as int".format(key))
+    for index, (key, values) in enumerate(intervals.items()):
+        # raises TypeError if interval limit values are not of the correct type
+        #     float for price, int for others
+        limit_type = float if key == 'price' else int
+        if type(values[0]) is not limit_type and type(values[1]) is not limit_type:
+            raise TypeError("{} limits should be set as {}".format(key, limit_type.__name__))
 
-        # raises ValueError if the upper limit is smaller than the lower limit
-        for key, values in intervals.items():
-            if intervals[key][1] < intervals[key][0]:
-                raise ValueError("Upper limit cannot be smaller than lower limit")
+        # raises ValueError if the upper limit is smaller than the lower limit,
+        #     checked for every limit right after the type of the first one
+        if index == 0:
+            for low, high in intervals.values():
+                if high < low:
+                    raise ValueError("Upper limit cannot be smaller than lower limit")
     # has no return value
 
 
-def load_intervals(file_path):
+def load_intervals(file_path, nutrients=()):
     """
     Loads intervals for calories, protein, fat, carbs and price from file.
 
     Limits are set as integers for calories, protein, fat and carbsprice has float limits
 
     :param file_path: file with intervals for calories, protein, fat, carbs and price
+    :param nutrients: names of additional nutrient columns whose integer limits are read too, e.g. fiber
     :return: a dictionary with limit names as keys and lower and upper limits as tuples values
     """
+    # the last line of every limit name wins, empty fields and blank lines are skipped
+    limits = dict()
     try:
-        fp = pd.read_csv(file_path, header=None)
+        with open(file_path) as interval_file:
+            for line in interval_file:
+                if line.strip():
+                    name, *values = line.strip().split(',')
+                    limits[name] = [value for value in values if value.strip()]
     except (FileNotFoundError, ValueError, TypeError):
         return -1
+    # a file without any lines can not be read, like pd.read_csv can not read it
+    if not limits:
+        return -1
 
-    limit_names = ['calories', 'protein', 'fat', 'carbs', 'price']
     intervals = dict()
-
-    for name in limit_names:
-        intervals[name] = tuple(i for i in fp[fp[0] == name].iloc[-1][1:] if not pd.isnull(i))
+    for name in STAT_NAMES + list(nutrients):
+        if name not in limits:
+            continue
+        values = limits[name]
 
         if name != 'price':
-            intervals[name] = int(intervals[name][0]), int(intervals[name][1])
-
-    if len(intervals['price']) != 2:
-        intervals['price'] = 0.0, float(intervals['price'][0])
-    else:
-        intervals['price'] = float(intervals['price'][0]), float(intervals['price'][1])
+            intervals[name] = int(float(values[0])), int(float(values[1]))
+        elif len(values) != 2:
+            intervals[name] = 0.0, float(values[0])
+        else:
+            intervals[name] = float(values[0]), float(values[1])
 
     check_intervals(intervals)
 
     return intervals
 
 
+class IntervalSpec:
+    def __init__(self, intervals, names=STAT_NAMES):
+        """Constructor - compiles interval limits into index based checks and
+        arrays aligned with STAT_NAMES, it can be passed to evaluate_lunch and
+        the search functions wherever an intervals dictionary is accepted
+
+        :param intervals: dictionary with limit requirements
+        :param names: names of the stats columns the limits refer to, price last
+        """
+        self.intervals = dict(intervals)
+        self.names = list(names)
+        self.checks = tuple((self.names.index(name), low, high) for name, (low, high) in self.intervals.items())
+        self.lows = np.full(len(self.names), -np.inf)
+        self.highs = np.full(len(self.names), np.inf)
+        for i, low, high in self.checks:
+            self.lows[i], self.highs[i] = low, high
+
+    def contains(self, totals) -> bool:
+        """Checks rounded lunch totals against the limits
+
+        :param totals: calories, protein, fat, carbs and price (see names) of a lunch rounded to 3 decimals
+        :return: True if the lunch meets requirements, False otherwise
+        """
+        for i, low, high in self.checks:
+            if totals[i] < low or totals[i] > high:
+                return False
+        return True
+
+    def mask(self, totals):
+        """Vectorized contains for many lunches
+
+        :param totals: numpy array with unrounded stats of one lunch per row
+        :return: numpy array of booleans
+        """
+        rounded = np.round(totals, 3)
+        mask = np.ones(len(totals), dtype=bool)
+        for i, low, high in self.checks:
+            mask &= (rounded[:, i] >= low) & (rounded[:, i] <= high)
+        return mask
+
+
+def compile_intervals(intervals):
+    """Compiles an intervals dictionary into an IntervalSpec
+
+    :param intervals: dictionary with limit requirements or IntervalSpec
+    :return: IntervalSpec, the same object if it already is one
+    """
+    if isinstance(intervals, IntervalSpec):
+        return intervals
+    return IntervalSpec(intervals)
+
+
 def calculate_stats(meal):
     """
     calculates calories, protein, fat and carbs for a serving of the meal
@@ -118,6 +291,9 @@ def calculate_stats(meal):
     :param meal: pandas dataframe row - Series
     :return: four floats: total calories, protein, fat and carbs in serving
     """
+    if SERVING_NAMES[0] in meal.index:
+        return tuple(meal[name] for name in SERVING_NAMES)
+
     names = ['calories', 'protein', 'fat', 'carbs']
     total = tuple(meal[name] * meal['amount'] / 100 for name in names)
     return total
@@ -132,21 +308,20 @@ def evaluate_lunch(soup, main, side, dessert, intervals):
     :param main: pandas Series
     :param side: pandas Series
     :param dessert: pandas Series
-    :param intervals: dictionary with limit requirements
+    :param intervals: dictionary with limit requirements or IntervalSpec
     :return: True if the lunch meets requirements, False otherwise
     """
-    names_dict = {'calories': 0, 'protein': 1, 'fat': 2, 'carbs': 3, 'price': 4}
     meals_list = [soup, main, side, dessert]
     meals_list = [calculate_stats(meal) + (meal['price'],) for meal in meals_list]
+    return compile_intervals(intervals).contains(_lunch_totals(meals_list))
+
+
+def _lunch_totals(meals_list):
+    # sums the stats tuples of the four meals, rounded to 3 decimals
     meals = list()
     for i in range(len(meals_list[0])):
         meals.append(round(sum((meal[i] for meal in meals_list)), 3))
-
-    for i in intervals:
-        if meals[names_dict[i]] < intervals[i][0] or meals[names_dict[i]] > intervals[i][1]:
-            return False
-
-    return True
+    return meals
 
 
 def get_lunch_price(soup, main, side, dessert):
@@ -162,6 +337,27 @@ def get_lunch_price(soup, main, side, dessert):
     return lunch_price
 
 
+def iter_combinations(soups, mains, sides, desserts, indices=False):
+    """
+    lazily yields all possible lunches where each lunch consists of
+    one soup, one main dish, one sidedish, and one dessert,
+    in the same order as generate_combinations
+
+    :param soups: pandas Dataframes
+    :param mains: pandas Dataframes
+    :param sides: pandas Dataframes
+    :param desserts: pandas Dataframes
+    :param indices: yield tuples of row indices instead of pandas Series
+    :return: iterator of tuples of four values
+    """
+    meals = [soups, mains, sides, desserts]
+    if indices:
+        return product(*(range(len(m)) for m in meals))
+
+    meals = [[m.reset_index(drop=True).loc[i] for i in range(len(m))] for m in meals]
+    return product(*meals)
+
+
 def generate_combinations(soups, mains, sides, desserts):
     """
     generates all possible lunches where each lunch consists of
@@ -173,12 +369,7 @@ def generate_combinations(soups, mains, sides, desserts):
     :param desserts: pandas Dataframes
     :return: list of combinations where each element is a tuple of four values
     """
-    meals = [soups, mains, sides, desserts]
-    meals = [m.reset_index(drop=True).loc[i] for m in meals for i in range(len(m))]
-    comb_iter = combinations(meals, 4)
-    comb = [e for e in comb_iter if [k['category'] for k in e] == ['soup', 'main dish', 'sidedish', 'dessert']]
-
-    return comb
+    return list(iter_combinations(soups, mains, sides, desserts))
 
 
 def find_best_meal(soups, mains, sides, desserts, intervals):
@@ -193,33 +384,1180 @@ def find_best_meal(soups, mains, sides, desserts, intervals):
     :param intervals: dictionary with limit requirements
     :return: cheapest possible lunch - list of four pandas Series (rows) price of the cheapest lunch - float if no combination meets the limits, it returns None and infinity
     """
-    meals_comb = generate_combinations(soups, mains, sides, desserts)
-    best_meals = None
+    menu = Menu(soups, mains, sides, desserts)
+    # numpy scalars, so the totals are rounded like evaluate_lunch rounds them
+    stats = [[tuple(row) for row in s] for s in menu.stats]
+    intervals = compile_intervals(intervals)
+    best_lunch = None
     price = float('inf')
 
-    for meal in meals_comb:
+    for lunch in product(*(range(size) for size in menu.sizes())):
+        meals_list = [stats[c][i] for c, i in enumerate(lunch)]
+
+        if not intervals.contains(_lunch_totals(meals_list)): continue
 
-        if not evaluate_lunch(*meal, intervals): continue
+        lunch_price = meals_list[0][-1] + meals_list[1][-1] + meals_list[2][-1] + meals_list[3][-1]
+        if best_lunch is None or price > lunch_price:
+            best_lunch = lunch
+            price = lunch_price
 
-        if ((best_meals is None and price == float('inf')) or
-                (get_lunch_price(*tuple(best_meals)) > get_lunch_price(*meal))):
-            best_meals = list(meal)
-            price = round(get_lunch_price(*meal), 2)
+    return menu.result(best_lunch, price)
 
-    return best_meals, price
 
+def find_best_meals(soups, mains, sides, desserts, intervals, k=3, tie_breaker=None, descending=False):
+    """
+    finds the k cheapest lunch combinations conforming to interval limits
+    in a single pass over all combinations, keeping only the k best in a heap
+
+    :param soups: pandas Dataframes
+    :param mains: pandas Dataframes
+    :param sides: pandas Dataframes
+    :param desserts: pandas Dataframes
+    :param intervals: dictionary with limit requirements
+    :param k: number of lunches to return
+    :param tie_breaker: nutrient (calories, protein, fat or carbs) deciding between lunches with the same price
+    :param descending: prefer lunches with more of the tie_breaker nutrient instead of less
+    :return: list of at most k tuples (lunch - list of four pandas Series, price - float), cheapest first
+    """
+    if k <= 0:
+        return list()
+
+    menu = Menu(soups, mains, sides, desserts)
+    # numpy scalars, so the totals are rounded like evaluate_lunch rounds them
+    stats = [[tuple(row) for row in s] for s in menu.stats]
+    intervals = compile_intervals(intervals)
+    sign = -1 if descending else 1
+    heap = list()
+
+    for order, lunch in enumerate(product(*(range(size) for size in menu.sizes()))):
+        meals_list = [stats[c][i] for c, i in enumerate(lunch)]
+        totals = _lunch_totals(meals_list)
+        if not intervals.contains(totals):
+            continue
+
+        # lunches are ranked by the reported price, so rounding noise in the
+        # sum does not override the tie_breaker
+        price = float(np.round(sum(meal[-1] for meal in meals_list), 2))
+        secondary = 0 if tie_breaker is None else sign * totals[STAT_NAMES.index(tie_breaker)]
+        # heapq is a min-heap, so the worst of the kept lunches sits on top
+        # when every part of the key is negated
+        item = (-price, -secondary, -order, lunch)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    return [(menu.lunch(lunch), -price) for price, _, _, lunch in sorted(heap, reverse=True)]
+
+
+def get_meal_stats(meals, nutrients=STAT_NAMES[:-1]):
+    """
+    calculates calories, protein, fat, carbs and price for a serving of
+    every meal in the dataframe, the same way calculate_stats does for one row
+
+    :param meals: pandas Dataframe or dictionary of column name - numpy array
+    :param nutrients: nutrient columns given per 100 units of amount, price is always appended
+    :return: numpy array with one row of len(nutrients) + 1 floats per meal
+    """
+    stats = list()
+    for name in nutrients:
+        if 'serving_' + name in meals.keys():
+            stats.append(np.asarray(meals['serving_' + name], dtype=float))
+        else:
+            stats.append(np.asarray(meals[name], dtype=float) * np.asarray(meals['amount'], dtype=float) / 100)
+    stats.append(np.asarray(meals['price'], dtype=float))
+    return np.column_stack(stats)
+
+
+def _ordered_sum(parts):
+    # adds the four category values in the order the lunch totals are summed,
+    # float addition is monotonic so the result bounds every lunch total
+    total = parts[0]
+    for part in parts[1:]:
+        total = total + part
+    return total
+
+
+def _find_dominated(keys, rows, prices, gap, block=256):
+    # keys - values where smaller is better sorted by (price, row) so that
+    # a dominating meal always comes first and meals only have to be compared
+    # with the earlier kept ones
+    def dominates(a, b):
+        return np.all(keys[a] <= keys[b], axis=-1) & ((rows[a] < rows[b]) | (prices[a] < prices[b] - gap))
+
+    dominated = np.zeros(len(keys), dtype=bool)
+    kept = np.zeros(0, dtype=np.intp)
+    step = max(1, CHUNK_SIZE // block)
+    for start in range(0, len(keys), block):
+        candidates = np.arange(start, min(start + block, len(keys)))
+        hit = dominates(candidates[:, None], candidates[None, :]).any(axis=0)
+        for first in range(0, len(kept), step):
+            hit |= dominates(kept[first:first + step, None], candidates[None, :]).any(axis=0)
+        dominated[candidates] = hit
+        kept = np.concatenate([kept, candidates[~hit]])
+    return dominated
+
+
+def _prune_rows(stats, intervals, exempt=()):
+    # rows of every category that can be part of the lunch find_best_meal
+    # returns, removing infeasible and dominated rows until nothing changes;
+    # rows of exempt categories are only removed when infeasible, so the
+    # cheapest lunch with any of them fixed is kept as well
+    rows = [np.arange(len(s)) for s in stats]
+    infeasible, dominated = [0] * len(stats), [0] * len(stats)
+    checked = [i for i, _, _ in intervals.checks]
+    price = len(intervals.lows) - 1
+
+    while all(len(r) for r in rows):
+        size = sum(len(r) for r in rows)
+        values = [s[r] for s, r in zip(stats, rows)]
+        lows = [v.min(axis=0) for v in values]
+        highs = [v.max(axis=0) for v in values]
+
+        # a meal whose best case lunch still breaks a limit
+        for c in range(len(rows)):
+            low = _ordered_sum(lows[:c] + [values[c]] + lows[c + 1:])
+            high = _ordered_sum(highs[:c] + [values[c]] + highs[c + 1:])
+            feasible = np.all((low <= intervals.highs + ROUNDING_SLACK) & (high >= intervals.lows - ROUNDING_SLACK), axis=1)
+            infeasible[c] += int(np.count_nonzero(~feasible))
+            rows[c], values[c] = rows[c][feasible], values[c][feasible]
+        if not all(len(r) for r in rows):
+            break
+
+        # limits that no lunch can reach only need the other side compared,
+        # limits reachable from both sides need equal values to swap meals
+        lows = [v.min(axis=0) for v in values]
+        highs = [v.max(axis=0) for v in values]
+        low_active = _ordered_sum(lows) < intervals.lows + ROUNDING_SLACK
+        high_active = _ordered_sum(highs) > intervals.highs - ROUNDING_SLACK
+        same = [i for i in checked if low_active[i] and (high_active[i] or i == price)]
+        smaller = [i for i in checked if high_active[i] and not low_active[i] and i != price]
+        larger = [i for i in checked if low_active[i] and not high_active[i] and i != price]
+        if price not in same:
+            smaller.append(price)
+        gap = 8 * np.finfo(float).eps * _ordered_sum([np.abs(v[:, price]).max() for v in values])
+
+        for c in range(len(rows)):
+            if c in exempt:
+                continue
+            # only meals with the same values of the two sided limits are compared
+            group = np.zeros(len(rows[c]), dtype=np.intp)
+            if same:
+                group = np.unique(values[c][:, same], axis=0, return_inverse=True)[1].ravel()
+            order = np.lexsort((rows[c], values[c][:, price], group))
+            v, r = values[c][order], rows[c][order]
+            keys = np.concatenate([v[:, smaller], -v[:, larger]], axis=1)
+            drop = np.zeros(len(r), dtype=bool)
+            bounds = np.flatnonzero(np.diff(group[order])) + 1
+            for first, last in zip(np.r_[0, bounds], np.r_[bounds, len(r)]):
+                if last - first > 1:
+                    drop[first:last] = _find_dominated(keys[first:last], r[first:last], v[first:last, price], gap)
+            dominated[c] += int(np.count_nonzero(drop))
+            rows[c] = np.sort(r[~drop])
+
+        if sum(len(r) for r in rows) == size:
+            break
+
+    return rows, infeasible, dominated
+
+
+def prune_meals(soups, mains, sides, desserts, intervals):
+    """
+    removes meals that can never be part of the lunch find_best_meal returns,
+    meals breaking a limit whatever the other three meals are and meals
+    dominated by another meal of the same category, i.e. one that is at least
+    as good on every limited nutrient and cheaper or as cheap and listed earlier,
+    find_best_meal on the pruned dataframes finds the same lunch and price
+
+    :param soups: pandas Dataframes
+    :param mains: pandas Dataframes
+    :param sides: pandas Dataframes
+    :param desserts: pandas Dataframes
+    :param intervals: dictionary with limit requirements or IntervalSpec
+    :return: four pruned dataframes and a report - dictionary with the kept rows of every category,
+     the number of meals and lunch combinations before and after and the meals removed per reason
+    """
+    frames = [soups, mains, sides, desserts]
+    rows, infeasible, dominated = _prune_rows([get_meal_stats(m) for m in frames], compile_intervals(intervals))
+    if not all(len(r) for r in rows):
+        rows = [r[:0] for r in rows]
+
+    sizes = tuple(len(m) for m in frames)
+    pruned_sizes = tuple(len(r) for r in rows)
+    combinations = int(np.prod(sizes, dtype=object))
+    pruned_combinations = int(np.prod(pruned_sizes, dtype=object))
+    report = {
+        'rows': [r.tolist() for r in rows],
+        'sizes': sizes,
+        'pruned_sizes': pruned_sizes,
+        'infeasible': tuple(infeasible),
+        'dominated': tuple(dominated),
+        'combinations': combinations,
+        'pruned_combinations': pruned_combinations,
+        'reduction': combinations / pruned_combinations if pruned_combinations else float('inf'),
+    }
+    return tuple(m.iloc[r].reset_index(drop=True) for m, r in zip(frames, rows)), report
+
+
+class Menu:
+    def __init__(self, soups, mains, sides, desserts):
+        """Constructor - array-backed menu: per-serving stats of every category
+        are kept in one contiguous float array and meals are referred to by
+        (category, row) handles, pandas Series are only built for results
+
+        :param soups: pandas Dataframes or dictionaries of column name - numpy array
+        :param mains: pandas Dataframes or dictionaries of column name - numpy array
+        :param sides: pandas Dataframes or dictionaries of column name - numpy array
+        :param desserts: pandas Dataframes or dictionaries of column name - numpy array
+        """
+        frames = [soups, mains, sides, desserts]
+        self.names = [np.asarray(m['meal']) for m in frames]
+        self.stats = [np.ascontiguousarray(get_meal_stats(m)) for m in frames]
+        self.columns = [{name: np.asarray(m[name]) for name in m.keys() if name not in SERVING_NAMES}
+                        for m in frames]
+
+    @classmethod
+    def from_arrays(cls, stats, columns):
+        """Builds the menu from already computed arrays, e.g. loaded by load_menu_cached
+
+        :param stats: list of four arrays with per-serving stats (see get_meal_stats)
+        :param columns: list of four dictionaries of column name - values array
+        :return: Menu
+        """
+        menu = cls.__new__(cls)
+        menu.names = [c['meal'] for c in columns]
+        menu.stats = list(stats)
+        menu.columns = list(columns)
+        return menu
+
+    @classmethod
+    def from_meals(cls, meal_df):
+        """Builds the menu from the dataframe returned by load_meals
+
+        :param meal_df: pandas dataframe with all meals
+        :return: Menu
+        """
+        return cls(*split_into_categories(meal_df))
+
+    def find_best_rows(self, intervals):
+        """Cheapest lunch of the menu without building any pandas objects
+
+        :param intervals: dictionary with limit requirements or IntervalSpec
+        :return: (soup, main, side, dessert) row indices or None, unrounded price or infinity
+        """
+        return _find_cheapest(self.stats, intervals)
+
+    def find_best_rows_batch(self, intervals_list):
+        """find_best_rows for many interval limits with a single pass over the lunches
+
+        :param intervals_list: list of dictionaries with limit requirements or IntervalSpecs
+        :return: list of (rows, price) like find_best_rows
+        """
+        return _find_cheapest_batch(self.stats, intervals_list)
+
+    def sizes(self) -> tuple:
+        """Number of meals in every category
+
+        :return: tuple of four ints
+        """
+        return tuple(len(s) for s in self.stats)
+
+    def handles(self, category: int) -> list[tuple]:
+        """Handles of all meals in a category
+
+        :param category: category index - 0 soups, 1 mains, 2 sides, 3 desserts
+        :return: list of (category, row) tuples
+        """
+        return [(category, row) for row in range(len(self.stats[category]))]
+
+    def meal(self, handle: tuple):
+        """Rebuilds the pandas Series of a meal
+
+        :param handle: (category, row) tuple
+        :return: pandas Series with the same values as the row of the category dataframe
+        """
+        import pandas as pd
+
+        category, row = handle
+        return pd.Series({name: values[row] for name, values in self.columns[category].items()}, name=row)
+
+    def lunch(self, rows):
+        """Rebuilds a lunch from row indices
+
+        :param rows: (soup, main, side, dessert) row indices
+        :return: list of four pandas Series
+        """
+        return [self.meal((category, int(row))) for category, row in enumerate(rows)]
+
+    def result(self, rows, price):
+        """Formats a search result the way find_best_meal returns it
+
+        :param rows: (soup, main, side, dessert) row indices or None
+        :param price: unrounded lunch price
+        :return: list of four pandas Series and price rounded to 2 decimals, None and infinity if rows is None
+        """
+        if rows is None:
+            return None, float('inf')
+        return self.lunch(rows), float(np.round(price, 2))
+
+
+def _iter_lunch_totals(stats, chunk_size=CHUNK_SIZE):
+    # yields (offset, totals) where totals holds the unrounded stats of
+    # consecutive lunches in generate_combinations order, at most about
+    # chunk_size lunches at a time; sums are built soup + main + side + dessert
+    # so they are bit for bit equal to the ones in evaluate_lunch
+    soups, mains, sides, desserts = stats
+    pairs = (soups[:, None, :] + mains[None, :, :]).reshape(-1, len(STAT_NAMES))
+    tail = len(sides) * len(desserts)
+    step = max(1, chunk_size // max(tail, 1))
+
+    for start in range(0, len(pairs), step):
+        block = pairs[start:start + step, None, None, :] + sides[None, :, None, :] + desserts[None, None, :, :]
+        yield start * tail, block.reshape(-1, len(STAT_NAMES))
+
+
+def _find_cheapest(stats, intervals, chunk_size=CHUNK_SIZE):
+    # returns the (soup, main, side, dessert) row indices of the first cheapest
+    # lunch in generate_combinations order and its unrounded price
+    intervals = compile_intervals(intervals)
+    best_index, best_price = None, float('inf')
+
+    for start, totals in _iter_lunch_totals(stats, chunk_size):
+        if not len(totals):
+            continue
+        prices = np.where(intervals.mask(totals), totals[:, -1], np.inf)
+        i = int(np.argmin(prices))
+        if prices[i] < best_price:
+            best_index, best_price = start + i, float(prices[i])
+
+    if best_index is None:
+        return None, best_price
+    return tuple(int(i) for i in np.unravel_index(best_index, tuple(len(s) for s in stats))), best_price
+
+
+def find_best_meal_batch(soups, mains, sides, desserts, intervals_list, chunk_size=CHUNK_SIZE):
+    """
+    answers find_best_meal for many interval limits over the same meals,
+    computing the stats of every combination only once and checking them
+    against all limits together
+
+    :param soups: pandas Dataframes
+    :param mains: pandas Dataframes
+    :param sides: pandas Dataframes
+    :param desserts: pandas Dataframes
+    :param intervals_list: list of dictionaries with limit requirements
+    :param chunk_size: approximate number of lunch and limits checks done at once
+    :return: list with the result of find_best_meal for every dictionary in intervals_list
+    """
+    menu = Menu(soups, mains, sides, desserts)
+    return [menu.result(rows, price) for rows, price in _find_cheapest_batch(menu.stats, intervals_list, chunk_size)]
+
+
+def _find_cheapest_batch(stats, intervals_list, chunk_size=CHUNK_SIZE):
+    # _find_cheapest for every intervals of the list with a single pass over the lunches
+    specs = [compile_intervals(intervals) for intervals in intervals_list]
+    lows = np.array([spec.lows for spec in specs]).reshape(-1, 1, len(STAT_NAMES))
+    highs = np.array([spec.highs for spec in specs]).reshape(-1, 1, len(STAT_NAMES))
+    best_index = np.full(len(specs), -1)
+    best_price = np.full(len(specs), np.inf)
+
+    for start, totals in _iter_lunch_totals(stats, max(1, chunk_size // max(len(specs), 1))):
+        if not len(totals):
+            continue
+        rounded = np.round(totals, 3)
+        mask = np.all((rounded >= lows) & (rounded <= highs), axis=2)
+        prices = np.where(mask, totals[:, -1], np.inf)
+        i = np.argmin(prices, axis=1)
+        chunk_price = prices[np.arange(len(prices)), i]
+        better = chunk_price < best_price
+        best_index[better], best_price[better] = start + i[better], chunk_price[better]
+
+    shape = tuple(len(s) for s in stats)
+    return [(None, float('inf')) if index == -1 else
+            (tuple(int(i) for i in np.unravel_index(index, shape)), float(price))
+            for index, price in zip(best_index, best_price)]
+
+
+def _branch_and_bound(stats, intervals):
+    # depth first search over soup, main and side with every category sorted
+    # by price; partial lunches are pruned when the cheapest (or most/least
+    # nutritious) way to complete them cannot fit the limits or beat the best
+    # price, and desserts are evaluated all at once at the last level
+    intervals = compile_intervals(intervals)
+    lows, highs = intervals.lows, intervals.highs
+    orders = [np.argsort(s[:, -1], kind='stable') for s in stats]
+    if any(not len(order) for order in orders):
+        return None, float('inf')
+
+    rest_min = [np.sum([s.min(axis=0) for s in stats[level:]], axis=0) for level in range(1, 4)]
+    rest_max = [np.sum([s.max(axis=0) for s in stats[level:]], axis=0) for level in range(1, 4)]
+    best_rows, best_price = None, float('inf')
+
+    def too_expensive(totals, level):
+        return totals[-1] + rest_min[level][-1] > best_price + ROUNDING_SLACK
+
+    def out_of_limits(totals, level):
+        return (np.any(totals + rest_min[level] > highs + ROUNDING_SLACK) or
+                np.any(totals + rest_max[level] < lows - ROUNDING_SLACK))
+
+    for i in orders[0]:
+        soup = stats[0][i]
+        if too_expensive(soup, 0):
+            break
+        if out_of_limits(soup, 0):
+            continue
+        for j in orders[1]:
+            lunch = soup + stats[1][j]
+            if too_expensive(lunch, 1):
+                break
+            if out_of_limits(lunch, 1):
+                continue
+            for k in orders[2]:
+                partial = lunch + stats[2][k]
+                if too_expensive(partial, 2):
+                    break
+                if out_of_limits(partial, 2):
+                    continue
+
+                totals = partial + stats[3]
+                prices = np.where(intervals.mask(totals), totals[:, -1], np.inf)
+                m = int(np.argmin(prices))
+                if prices[m] == np.inf:
+                    continue
+                rows = (int(i), int(j), int(k), m)
+                if prices[m] < best_price or (prices[m] == best_price and rows < best_rows):
+                    best_rows, best_price = rows, float(prices[m])
+
+    return best_rows, best_price
+
+
+def find_best_meal_bnb(soups, mains, sides, desserts, intervals):
+    """
+    same as find_best_meal, but searches the lunches with branch and bound:
+    meals are tried from the cheapest and partial lunches that can no longer
+    meet the limits or beat the cheapest lunch found so far are skipped
+
+    :param soups: pandas Dataframes
+    :param mains: pandas Dataframes
+    :param sides: pandas Dataframes
+    :param desserts: pandas Dataframes
+    :param intervals: dictionary with limit requirements
+    :return: cheapest possible lunch - list of four pandas Series (rows) price of the cheapest lunch - float if no combination meets the limits, it returns None and infinity
+    """
+    menu = Menu(soups, mains, sides, desserts)
+    return menu.result(*_branch_and_bound(menu.stats, intervals))
+
+
+def _meet_in_the_middle(stats, intervals):
+    # joins a table of (soup, main) pairs with a table of (side, dessert)
+    # pairs sorted by price: for every soup and main, binary search narrows the
+    # sides and desserts down to the ones whose price can still give a valid
+    # lunch cheaper than the best one so far, and only those are checked
+    soups, mains, sides, desserts = stats
+    intervals = compile_intervals(intervals)
+    lows, highs = intervals.lows, intervals.highs
+    if not all(len(s) for s in stats):
+        return None, float('inf')
+
+    left = (soups[:, None, :] + mains[None, :, :]).reshape(-1, len(STAT_NAMES))
+    right = (sides[:, None, :] + desserts[None, :, :]).reshape(-1, len(STAT_NAMES))
+    right_order = np.argsort(right[:, -1], kind='stable')
+    right_prices = right[right_order, -1]
+    right_min, right_max = right.min(axis=0), right.max(axis=0)
+    best_rows, best_price = None, float('inf')
+
+    for pair in np.argsort(left[:, -1], kind='stable'):
+        totals = left[pair]
+        if totals[-1] + right_prices[0] > best_price + ROUNDING_SLACK:
+            break
+        if (np.any(totals + right_min > highs + ROUNDING_SLACK) or
+                np.any(totals + right_max < lows - ROUNDING_SLACK)):
+            continue
+
+        low = lows[-1] - totals[-1] - ROUNDING_SLACK
+        high = min(highs[-1], best_price) - totals[-1] + ROUNDING_SLACK
+        start, stop = np.searchsorted(right_prices, [low, high], side='left')
+        candidates = right_order[start:stop]
+        fits = np.all((totals + right[candidates] >= lows - ROUNDING_SLACK) &
+                      (totals + right[candidates] <= highs + ROUNDING_SLACK), axis=1)
+        candidates = np.sort(candidates[fits])
+        if not len(candidates):
+            continue
+
+        k, m = np.divmod(candidates, len(desserts))
+        lunches = totals + sides[k] + desserts[m]
+        prices = np.where(intervals.mask(lunches), lunches[:, -1], np.inf)
+        c = int(np.argmin(prices))
+        if prices[c] == np.inf:
+            continue
+        rows = tuple(int(i) for i in np.divmod(pair, len(mains))) + (int(k[c]), int(m[c]))
+        if prices[c] < best_price or (prices[c] == best_price and rows < best_rows):
+            best_rows, best_price = rows, float(prices[c])
+
+    return best_rows, best_price
+
+
+def find_best_meal_mitm(soups, mains, sides, desserts, intervals):
+    """
+    same as find_best_meal, but splits every lunch into a soup and main pair
+    and a side and dessert pair and looks up the cheapest matching second pair
+    for every first pair with a binary search over pairs sorted by price
+
+    :param soups: pandas Dataframes
+    :param mains: pandas Dataframes
+    :param sides: pandas Dataframes
+    :param desserts: pandas Dataframes
+    :param intervals: dictionary with limit requirements
+    :return: cheapest possible lunch - list of four pandas Series (rows) price of the cheapest lunch - float if no combination meets the limits, it returns None and infinity
+    """
+    menu = Menu(soups, mains, sides, desserts)
+    return menu.result(*_meet_in_the_middle(menu.stats, intervals))
+
+
+def find_best_meal_vectorized(soups, mains, sides, desserts, intervals, chunk_size=CHUNK_SIZE):
+    """
+    same as find_best_meal, but converts the meals into numpy arrays once
+    and evaluates all combinations with broadcasting, chunk_size lunches at a time
+
+    :param soups: pandas Dataframes
+    :param mains: pandas Dataframes
+    :param sides: pandas Dataframes
+    :param desserts: pandas Dataframes
+    :param intervals: dictionary with limit requirements
+    :param chunk_size: approximate number of lunches evaluated at once
+    :return: cheapest possible lunch - list of four pandas Series (rows) price of the cheapest lunch - float if no combination meets the limits, it returns None and infinity
+    """
+    menu = Menu(soups, mains, sides, desserts)
+    return menu.result(*_find_cheapest(menu.stats, intervals, chunk_size))
+
+
+# menu stats and intervals shared once per worker process of find_best_meal_parallel
+_WORKER_STATE = dict()
+
+
+def _init_worker(stats, intervals, chunk_size):
+    _WORKER_STATE.update(stats=stats, intervals=intervals, chunk_size=chunk_size)
+
+
+def _search_soups(soup_rows):
+    # cheapest lunch among the lunches starting with the given block of soups
+    soups, mains, sides, desserts = _WORKER_STATE['stats']
+    start, stop = soup_rows
+    rows, price = _find_cheapest([soups[start:stop], mains, sides, desserts],
+                                 _WORKER_STATE['intervals'], _WORKER_STATE['chunk_size'])
+    if rows is None:
+        return None, price
+    return (rows[0] + start,) + rows[1:], price
+
+
+def find_best_meal_parallel(soups, mains, sides, desserts, intervals, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    same as find_best_meal, but splits the lunches into blocks of soups
+    and searches the blocks in a pool of worker processes
+
+    :param soups: pandas Dataframes
+    :param mains: pandas Dataframes
+    :param sides: pandas Dataframes
+    :param desserts: pandas Dataframes
+    :param intervals: dictionary with limit requirements
+    :param workers: number of processes, all cores by default
+    :param chunk_size: approximate number of lunches evaluated at once by a worker
+    :return: cheapest possible lunch - list of four pandas Series (rows) price of the cheapest lunch - float if no combination meets the limits, it returns None and infinity
+    """
+    menu = Menu(soups, mains, sides, desserts)
+    workers = workers or os.cpu_count() or 1
+    block = max(1, -(-len(menu.stats[0]) // (workers * 4)))
+    blocks = [(start, start + block) for start in range(0, len(menu.stats[0]), block)]
+
+    if workers == 1 or len(blocks) <= 1:
+        return menu.result(*_find_cheapest(menu.stats, intervals, chunk_size))
+
+    best_rows, best_price = None, float('inf')
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(menu.stats, intervals, chunk_size)) as pool:
+        # blocks come back in soup order and only a strictly cheaper lunch
+        # replaces the best one, so ties are resolved as in find_best_meal
+        for rows, price in pool.map(_search_soups, blocks):
+            if price < best_price:
+                best_rows, best_price = rows, price
+
+    return menu.result(best_rows, best_price)
+
+
+def find_best_meal_ip(soups, mains, sides, desserts, intervals):
+    """
+    same as find_best_meal, but solved as a 0/1 program - one meal per category,
+    linear lower and upper limits on the nutrients, minimal price - so limits
+    on any other nutrient column (e.g. fiber, sodium or sugar per 100 units of
+    amount, see load_intervals) are accepted too; meals that cannot be part of
+    the optimum are removed first (see prune_meals) and the remaining ones are
+    searched with branch and bound
+
+    :param soups: pandas Dataframes
+    :param mains: pandas Dataframes
+    :param sides: pandas Dataframes
+    :param desserts: pandas Dataframes
+    :param intervals: dictionary with limit requirements, may contain limits on extra nutrient columns
+    :return: cheapest possible lunch - list of four pandas Series (rows) price of the cheapest lunch - float if no combination meets the limits, it returns None and infinity
+    """
+    frames = [soups, mains, sides, desserts]
+    limits = intervals.intervals if isinstance(intervals, IntervalSpec) else intervals
+    nutrients = [name for name in limits if name != 'price']
+    spec = IntervalSpec(limits, nutrients + ['price'])
+    stats = [get_meal_stats(m, nutrients) for m in frames]
+
+    rows, _, _ = _prune_rows(stats, spec)
+    best_rows, best_price = None, float('inf')
+    if all(len(r) for r in rows):
+        best_rows, best_price = _branch_and_bound([s[r] for s, r in zip(stats, rows)], spec)
+    if best_rows is not None:
+        best_rows = tuple(int(r[row]) for r, row in zip(rows, best_rows))
+    return Menu(*frames).result(best_rows, best_price)
+
+
+# interchangeable implementations of find_best_meal, only ip accepts limits
+# on nutrients other than calories, protein, fat and carbs
+SOLVERS = {
+    'brute': find_best_meal,
+    'vectorized': find_best_meal_vectorized,
+    'bnb': find_best_meal_bnb,
+    'mitm': find_best_meal_mitm,
+    'parallel': find_best_meal_parallel,
+    'ip': find_best_meal_ip,
+}
+
+
+def menu_key(soups, mains, sides, desserts) -> str:
+    """Content hash of the four category dataframes, changes whenever any value changes
+
+    :param soups: pandas Dataframes
+    :param mains: pandas Dataframes
+    :param sides: pandas Dataframes
+    :param desserts: pandas Dataframes
+    :return: hex digest
+    """
+    digest = hashlib.sha1()
+    for meals in [soups, mains, sides, desserts]:
+        digest.update('\x1e'.join(map(str, meals.columns)).encode())
+        for name in meals.columns:
+            values = meals[name].to_numpy()
+            if values.dtype.kind in 'biuf':
+                digest.update(values.dtype.str.encode() + np.ascontiguousarray(values).tobytes())
+            else:
+                digest.update('\x1f'.join(map(str, values)).encode())
+    return digest.hexdigest()
+
+
+def interval_key(intervals) -> tuple:
+    """Normalized, hashable form of interval limits
+
+    :param intervals: dictionary with limit requirements or IntervalSpec
+    :return: tuple of (name, lower, upper) sorted by name
+    """
+    if isinstance(intervals, IntervalSpec):
+        intervals = intervals.intervals
+    return tuple(sorted((name, float(low), float(high)) for name, (low, high) in intervals.items()))
+
+
+class QueryCache:
+    def __init__(self, maxsize: int = 128, ttl: float = None, solver=None):
+        """Constructor - LRU cache of search results keyed by menu content and interval limits
+
+        :param maxsize: maximum number of cached results, the least recently used one is evicted
+        :param ttl: seconds a result stays valid, forever if None
+        :param solver: name in SOLVERS or function with the signature of find_best_meal used on a miss
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.solver = SOLVERS[solver] if isinstance(solver, str) else solver or find_best_meal
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, menu, intervals):
+        """Returns the cached result, counting a hit or a miss
+
+        :param menu: hashable key of the menu, e.g. from menu_key
+        :param intervals: dictionary with limit requirements or IntervalSpec
+        :return: tuple (found, result), result is None when not found or expired
+        """
+        key = menu, interval_key(intervals)
+        if key in self.results:
+            expires, result = self.results[key]
+            if expires is None or expires > time.monotonic():
+                self.results.move_to_end(key)
+                self.hits += 1
+                return True, result
+            del self.results[key]
+
+        self.misses += 1
+        return False, None
+
+    def put(self, menu, intervals, result):
+        """Stores a result, evicting the least recently used one when full
+
+        :param menu: hashable key of the menu, e.g. from menu_key
+        :param intervals: dictionary with limit requirements or IntervalSpec
+        :param result: value to cache
+        """
+        key = menu, interval_key(intervals)
+        self.results[key] = (None if self.ttl is None else time.monotonic() + self.ttl), result
+        self.results.move_to_end(key)
+        if len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, menu, intervals, compute):
+        """Returns the cached result for the menu key and intervals or computes and stores it
+
+        :param menu: hashable key of the menu, e.g. from menu_key
+        :param intervals: dictionary with limit requirements or IntervalSpec
+        :param compute: function without arguments returning the result on a miss
+        :return: cached or computed result
+        """
+        found, result = self.get(menu, intervals)
+        if not found:
+            result = compute()
+            self.put(menu, intervals, result)
+        return result
+
+    def find_best_meal(self, soups, mains, sides, desserts, intervals):
+        """Cached find_best_meal, a changed menu gets a new content hash and is searched again
+
+        :param soups: pandas Dataframes
+        :param mains: pandas Dataframes
+        :param sides: pandas Dataframes
+        :param desserts: pandas Dataframes
+        :param intervals: dictionary with limit requirements
+        :return: same as find_best_meal
+        """
+        best_meals, price = self.lookup(menu_key(soups, mains, sides, desserts), intervals,
+                                        lambda: self.solver(soups, mains, sides, desserts, intervals))
+        return (None if best_meals is None else list(best_meals)), price
+
+    def clear(self):
+        """Drops all cached results, counters are kept"""
+        self.results.clear()
+
+    def info(self) -> dict:
+        """Cache statistics
+
+        :return: dictionary with hits, misses, evictions, size and maxsize
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self.results), 'maxsize': self.maxsize}
+
+
+class LunchOptimizer:
+    def __init__(self, soups, mains, sides, desserts, intervals):
+        """Constructor - keeps the cheapest lunch for every soup so that
+        changes to the menu during the day only recompute the affected soups
+
+        :param soups: pandas Dataframes
+        :param mains: pandas Dataframes
+        :param sides: pandas Dataframes
+        :param desserts: pandas Dataframes
+        :param intervals: dictionary with limit requirements
+        """
+        menu = Menu(soups, mains, sides, desserts)
+        self.intervals = compile_intervals(intervals)
+        self.stats = menu.stats
+        self.meals = [[menu.meal(handle) for handle in menu.handles(category)] for category in range(4)]
+        # removed meals stay in place and are only marked inactive, so rows keep
+        # the relative order they have in a freshly loaded menu
+        self.active = [np.ones(len(s), dtype=bool) for s in self.stats]
+        self.soup_best = {soup: self._search(soup) for soup in range(len(self.stats[0]))}
+
+    @classmethod
+    def from_files(cls, meal_file_path, interval_file_path):
+        """Builds the optimizer the same way main loads its inputs
+
+        :param meal_file_path: csv file with meals
+        :param interval_file_path: file with intervals
+        :return: LunchOptimizer
+        """
+        return cls(*split_into_categories(load_meals(meal_file_path)), load_intervals(interval_file_path))
+
+    def _search(self, soup, category=None, row=None):
+        # cheapest (price, rows) lunch with the given soup, optionally only
+        # among lunches containing the given row of another category
+        rows = [np.array([soup])] + [np.flatnonzero(active) for active in self.active[1:]]
+        if category is not None:
+            rows[category] = np.array([row])
+
+        lunch, price = _find_cheapest([s[r] for s, r in zip(self.stats, rows)], self.intervals)
+        if lunch is None:
+            return None
+        return price, tuple(int(r[i]) for r, i in zip(rows, lunch))
+
+    def _find_row(self, category, name):
+        matches = np.flatnonzero(self.active[category] & (np.array([m.meal for m in self.meals[category]]) == name))
+        if not len(matches):
+            raise KeyError("Meal {} is not on the menu".format(name))
+        return int(matches[0])
+
+    def _merge(self, category, row):
+        # offers the lunches containing the row to every soup
+        for soup in self.soup_best:
+            best = self._search(soup, category, row)
+            if best is not None and (self.soup_best[soup] is None or best < self.soup_best[soup]):
+                self.soup_best[soup] = best
+
+    def _recompute_using(self, category, row):
+        for soup, best in self.soup_best.items():
+            if best is not None and best[1][category] == row:
+                self.soup_best[soup] = self._search(soup)
+
+    def best_lunch(self):
+        """Cheapest lunch for the current menu
+
+        :return: same as find_best_meal
+        """
+        best = min((b for b in self.soup_best.values() if b is not None), default=None)
+        if best is None:
+            return None, float('inf')
+
+        price, rows = best
+        lunch = list()
+        for category, row in enumerate(rows):
+            position = int(np.count_nonzero(self.active[category][:row]))
+            lunch.append(self.meals[category][row].rename(position))
+        return lunch, float(np.round(price, 2))
+
+    def remove_meal(self, category, name):
+        """Removes a meal (e.g. sold out) and recomputes only the soups whose best lunch contained it
+
+        :param category: soup, main dish, sidedish or dessert
+        :param name: meal name
+        :return: new best lunch, same as find_best_meal
+        """
+        category = MEAL_CATEGORIES.index(category)
+        row = self._find_row(category, name)
+        self.active[category][row] = False
+
+        if category == 0:
+            del self.soup_best[row]
+        else:
+            self._recompute_using(category, row)
+        return self.best_lunch()
+
+    def add_meal(self, category, meal):
+        """Adds a meal at the end of its category and only evaluates the lunches containing it
+
+        :param category: soup, main dish, sidedish or dessert
+        :param meal: dictionary or pandas Series with the meal columns from load_meals
+        :return: new best lunch, same as find_best_meal
+        """
+        import pandas as pd
+
+        category = MEAL_CATEGORIES.index(category)
+        meal = pd.Series(meal, name=len(self.meals[category]))
+        self.stats[category] = np.vstack([self.stats[category], get_meal_stats(meal.to_frame().T)])
+        self.meals[category].append(meal)
+        self.active[category] = np.append(self.active[category], True)
+        row = len(self.meals[category]) - 1
+
+        if category == 0:
+            self.soup_best[row] = self._search(row)
+        else:
+            self._merge(category, row)
+        return self.best_lunch()
+
+    def update_price(self, category, name, price):
+        """Changes the price of a meal, recomputing the soups whose best lunch
+        contained it and re-evaluating only the lunches containing it for the others
+
+        :param category: soup, main dish, sidedish or dessert
+        :param name: meal name
+        :param price: new price
+        :return: new best lunch, same as find_best_meal
+        """
+        category = MEAL_CATEGORIES.index(category)
+        row = self._find_row(category, name)
+        self.stats[category][row, -1] = price
+        self.meals[category][row]['price'] = price
+
+        if category == 0:
+            self.soup_best[row] = self._search(row)
+        else:
+            self._recompute_using(category, row)
+            self._merge(category, row)
+        return self.best_lunch()
+
+
+def _union_rows(frames):
+    # deduplicates the rows of several dataframes of one category, returns
+    # the union dataframe and, for every dataframe, the union row of each row
+    import pandas as pd
+
+    seen = dict()
+    first = list()
+    positions = list()
+    offset = 0
+    for frame in frames:
+        local = list()
+        for i, record in enumerate(frame.itertuples(index=False, name=None)):
+            if record not in seen:
+                seen[record] = len(first)
+                first.append(offset + i)
+            local.append(seen[record])
+        positions.append(np.array(local, dtype=np.intp))
+        offset += len(frame)
+
+    union = pd.concat(frames, ignore_index=True).iloc[first].reset_index(drop=True)
+    return union, positions
+
+
+def _plan_candidates(stats, local_rows, day_shapes, specs, groups, group_shape, chunk_size=CHUNK_SIZE):
+    # single pass over the lunches of the union menu checking all days at once;
+    # returns for every day a dictionary group - (price, day order, union rows)
+    # with the cheapest lunch of the day for every combination of meals that
+    # must not repeat, ties going to the first lunch in the order of the day
+    shape = tuple(len(s) for s in stats)
+    best = [dict() for _ in specs]
+
+    for start, totals in _iter_lunch_totals(stats, chunk_size):
+        if not len(totals):
+            continue
+        rounded = np.round(totals, 3)
+
+        for day, day_rows in enumerate(local_rows):
+            mask = np.ones(len(totals), dtype=bool)
+            for i, low, high in specs[day].checks:
+                mask &= (rounded[:, i] >= low) & (rounded[:, i] <= high)
+            found = np.flatnonzero(mask)
+            rows = np.unravel_index(start + found, shape)
+            local = [r[rows[c]] for c, r in enumerate(day_rows)]
+            offered = np.all([r >= 0 for r in local], axis=0)
+            found, rows, local = found[offered], [r[offered] for r in rows], [r[offered] for r in local]
+            if not len(found):
+                continue
+            order = np.ravel_multi_index(local, day_shapes[day])
+            group = np.zeros(len(found), dtype=np.intp)
+            if groups:
+                group = np.ravel_multi_index([g[rows[c]] for c, g in groups], group_shape)
+            prices = totals[found, -1]
+            first = np.lexsort((order, prices, group))
+            _, unique = np.unique(group[first], return_index=True)
+            for i in first[unique]:
+                candidate = (float(prices[i]), int(order[i]), tuple(int(r[i]) for r in rows))
+                if int(group[i]) not in best[day] or candidate[:2] < best[day][int(group[i])][:2]:
+                    best[day][int(group[i])] = candidate
+    return best
+
+
+def plan_week(days, no_repeat=('main dish',), chunk_size=CHUNK_SIZE):
+    """
+    plans the cheapest lunches of several days in one batched search: the menus
+    of all days are merged, stats of meals offered on more days are computed
+    only once and every lunch of the merged menu is checked against the limits
+    of all days at once; meals of the no_repeat categories are served at most
+    once a week, without conflicts every day gets the lunch of find_best_meal
+
+    :param days: list of (meals, intervals) for every day, meals - csv file or dataframe from load_meals,
+     intervals - interval file or dictionary with limit requirements
+    :param no_repeat: categories (see MEAL_CATEGORIES) whose meals, by name, can not be repeated during the week
+    :param chunk_size: approximate number of lunch and limits checks done at once
+    :return: list with the lunch (list of four pandas Series) and its price for every day and the price of the week,
+     if the limits or no_repeat can not be met it returns None and infinity
+    """
+    loaded = dict()
+    menus, specs = list(), list()
+    for day_meals, day_intervals in days:
+        if isinstance(day_meals, str):
+            if day_meals not in loaded:
+                loaded[day_meals] = split_into_categories(load_meals(day_meals))
+            day_meals = loaded[day_meals]
+        else:
+            day_meals = split_into_categories(day_meals)
+        if isinstance(day_intervals, str):
+            day_intervals = load_intervals(day_intervals)
+        menus.append(day_meals)
+        specs.append(compile_intervals(day_intervals))
+
+    repeat = [MEAL_CATEGORIES.index(category) for category in no_repeat]
+    unions, stats, positions = list(), list(), list()
+    for c in range(len(MEAL_CATEGORIES)):
+        union, rows = _union_rows([menu[c] for menu in menus])
+        unions.append(union)
+        stats.append(get_meal_stats(union))
+        positions.append(rows)
+
+    # every day only offers its meals that can be part of its cheapest lunch,
+    # local_rows maps union rows to the row of the day or -1
+    local_rows = list()
+    for day, spec in enumerate(specs):
+        day_stats = [s[p[day]] for s, p in zip(stats, positions)]
+        kept, _, _ = _prune_rows(day_stats, spec, exempt=repeat)
+        day_rows = list()
+        for c, rows in enumerate(kept):
+            local = np.full(len(stats[c]), len(positions[c][day]), dtype=np.intp)
+            np.minimum.at(local, positions[c][day][rows], rows)
+            local[local == len(positions[c][day])] = -1
+            day_rows.append(local)
+        local_rows.append(day_rows)
+
+    # the union menu is narrowed to the meals some day still offers
+    used = [np.flatnonzero(np.any([rows[c] >= 0 for rows in local_rows], axis=0)) for c in range(len(stats))]
+    names = [np.unique(u['meal'].to_numpy()[rows], return_inverse=True) for u, rows in zip(unions, used)]
+    groups = [(c, names[c][1].ravel()) for c in repeat]
+
+    # days with the same meals and limits, e.g. a fixed weekly menu, are searched once
+    profiles, searched, day_profile = dict(), list(), list()
+    for day, spec in enumerate(specs):
+        key = interval_key(spec), tuple(r[rows].tobytes() for r, rows in zip(local_rows[day], used))
+        if key not in profiles:
+            profiles[key] = len(searched)
+            searched.append(day)
+        day_profile.append(profiles[key])
+
+    found = _plan_candidates([s[rows] for s, rows in zip(stats, used)],
+                             [[r[rows] for r, rows in zip(local_rows[day], used)] for day in searched],
+                             [tuple(len(m) for m in menus[day]) for day in searched], [specs[day] for day in searched],
+                             groups, tuple(len(names[c][0]) for c in repeat), chunk_size)
+    candidates = [found[profile] for profile in day_profile]
+    if not all(candidates):
+        return None, float('inf')
+
+    # depth first search over the days with the candidates of every day sorted
+    # by price, skipping plans that repeat a meal or can not beat the best one
+    options = [[(float(np.round(price, 2)), rows) for price, order, rows in sorted(day.values())] for day in candidates]
+    # rest[day] - the lowest possible price of the days from day on
+    rest = [0.0]
+    for day in reversed(options):
+        rest.insert(0, round(rest[0] + day[0][0], 2))
+    best_plan, best_total = None, float('inf')
+    plan, served = list(), set()
+
+    def search(day, total):
+        nonlocal best_plan, best_total
+        if day == len(options):
+            best_plan, best_total = list(plan), total
+            return
+        for option in options[day]:
+            if round(total + option[0] + rest[day + 1], 2) >= best_total:
+                break
+            meals_served = {(c, int(g[option[1][c]])) for c, g in groups}
+            if meals_served & served:
+                continue
+            plan.append(option)
+            served.update(meals_served)
+            search(day + 1, round(total + option[0], 2))
+            served.difference_update(meals_served)
+            plan.pop()
+
+    search(0, 0.0)
+    if best_plan is None:
+        return None, float('inf')
+
+    # lunches are built by Menu like find_best_meal builds them, without the serving columns
+    week = list()
+    for day, (price, rows) in enumerate(best_plan):
+        lunch = Menu(*menus[day]).lunch([local_rows[day][c][used[c][row]] for c, row in enumerate(rows)])
+        week.append((lunch, price))
+    return week, best_total
+
+
+def _write_menu_cache(menu, directory, key):
+    # every array goes into its own .npy file, written to a temporary
+    # directory first so a reader never sees a half written cache
+    temp = '{}.{}.tmp'.format(directory, os.getpid())
+    shutil.rmtree(temp, ignore_errors=True)
+    os.makedirs(temp)
+
+    names = [list(columns) for columns in menu.columns]
+    for category, (stats, columns) in enumerate(zip(menu.stats, menu.columns)):
+        np.save(os.path.join(temp, '{}_stats.npy'.format(category)), stats)
+        for i, values in enumerate(columns.values()):
+            if values.dtype.kind not in 'biuf':
+                values = values.astype(str)
+            np.save(os.path.join(temp, '{}_{}.npy'.format(category, i)), values)
+
+    with open(os.path.join(temp, 'meta.json'), 'w') as meta:
+        json.dump({'key': key, 'columns': names}, meta)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(temp, directory)
+
+
+def _read_menu_cache(directory, meta):
+    stats, columns = list(), list()
+    for category, names in enumerate(meta['columns']):
+        stats.append(np.load(os.path.join(directory, '{}_stats.npy'.format(category)), mmap_mode='r'))
+        columns.append({name: np.load(os.path.join(directory, '{}_{}.npy'.format(category, i)), mmap_mode='r')
+                        for i, name in enumerate(names)})
+    return Menu.from_arrays(stats, columns)
+
+
+def load_menu_cached(meal_file_path, cache_dir=None):
+    """Loads the menu of a csv file through an on-disk cache of memory-mapped
+    numpy arrays, the csv is only parsed again when its path, modification
+    time or size changes
+
+    :param meal_file_path: csv file
+    :param cache_dir: cache directory, MENU_CACHE_DIR next to the csv file by default
+    :return: Menu if can read the file otherwise return -1
+    """
+    try:
+        source = os.path.abspath(meal_file_path)
+        info = os.stat(source)
+    except (FileNotFoundError, TypeError):
+        return -1
+
+    cache_dir = cache_dir or os.path.join(os.path.dirname(source), MENU_CACHE_DIR)
+    directory = os.path.join(cache_dir, hashlib.sha1(source.encode()).hexdigest()[:16])
+    key = {'source': source, 'mtime': info.st_mtime_ns, 'size': info.st_size}
+
+    try:
+        with open(os.path.join(directory, 'meta.json')) as meta_file:
+            meta = json.load(meta_file)
+    except (FileNotFoundError, ValueError):
+        meta = None
+
+    if meta is not None and meta['key'] == key:
+        return _read_menu_cache(directory, meta)
+
+    meal_df = load_meals(meal_file_path)
+    if isinstance(meal_df, int):
+        return -1
+    menu = Menu.from_meals(meal_df)
+    _write_menu_cache(menu, directory, key)
+    return menu
+
+
+def main(meal_file_path, interval_file_path, use_cache=False, solver='brute'):
+    # returns the lunch as pandas Series, so pandas is imported even with
+    # use_cache - quick_main answers without it
+    if use_cache:
+        menu = load_menu_cached(meal_file_path)
+        return menu.result(*menu.find_best_rows(load_intervals(interval_file_path)))
 
-def main(meal_file_path, interval_file_path):
     meal_df = load_meals(meal_file_path)
     intervals = load_intervals(interval_file_path)
 
     soups, mains, sides, desserts = split_into_categories(meal_df)
 
-    return find_best_meal(soups, mains, sides, desserts, intervals)
+    return SOLVERS[solver](soups, mains, sides, desserts, intervals)
+
+
+def quick_main(meal_file_path, interval_file_path):
+    """Cheapest lunch without importing pandas: the csv file is read by load_menu
+    and searched by Menu.find_best_rows, for one-off command line queries
+
+    :param meal_file_path: csv file
+    :param interval_file_path: file with intervals for calories, protein, fat, carbs and price
+    :return: list of the four meal names and price rounded to 2 decimals, None and infinity
+     if no combination meets the limits
+    """
+    menu = load_menu(meal_file_path)
+    rows, price = menu.find_best_rows(load_intervals(interval_file_path))
+    if rows is None:
+        return None, float('inf')
+    return [str(menu.names[category][row]) for category, row in enumerate(rows)], float(np.round(price, 2))
 
 
 if __name__ == '__main__':
-    result = main(
+    result = quick_main(
         '1a_sample_meals.csv',
         '1a_sample_interval.txt'
     )
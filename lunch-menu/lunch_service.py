@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import lunch_menu as lm
+
+# queries for the same menu arriving within this many seconds are answered together
+BATCH_WINDOW = 0.005
+MAX_BODY_SIZE = 2 ** 20
+# errors raised by lunch_menu for files that are not a menu or intervals file
+FILE_ERRORS = (KeyError, IndexError, TypeError, ValueError)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        """Constructor
+
+        :param status: HTTP status code
+        :param message: error message sent to the client
+        """
+        super().__init__(message)
+        self.status = status
+
+
+def parse_intervals(data) -> dict:
+    """Converts intervals from a JSON request to the dictionary load_intervals returns
+
+    :param data: dictionary of limit name - [lower, upper] list
+    :return: dictionary with limit names as keys and lower and upper limits as tuples values
+    """
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Intervals must be an object")
+
+    intervals = dict()
+    for name, values in data.items():
+        if not isinstance(values, list) or not all(isinstance(v, (int, float)) for v in values):
+            raise HTTPError(400, "Interval limits should be lists of numbers")
+        intervals[name] = tuple(float(v) for v in values) if name == 'price' else tuple(values)
+
+    try:
+        lm.check_intervals(intervals)
+    except (TypeError, KeyError, ValueError) as e:
+        raise HTTPError(400, str(e).strip("'"))
+    return intervals
+
+
+class LunchService:
+    def __init__(self, batch_window: float = BATCH_WINDOW, workers: int = None, cache_size: int = 1024,
+                 menu_dir: str = '.'):
+        """Constructor - keeps parsed menus in memory and answers lunch queries,
+        searches run in a thread pool so the event loop stays responsive
+        (the heavy numpy work releases the GIL)
+
+        :param batch_window: seconds to wait for more queries of the same menu before searching
+        :param workers: number of search threads
+        :param cache_size: number of answers remembered per (menu file version, intervals)
+        :param menu_dir: directory the menu and intervals files of the requests are read from
+        """
+        self.menu_dir = os.path.realpath(menu_dir)
+        self.batch_window = batch_window
+        self.executor = ThreadPoolExecutor(workers)
+        self.cache = lm.QueryCache(cache_size)
+        self.menus = dict()
+        self.pending = dict()
+
+    def resolve(self, path: str) -> str:
+        """Turns a file name from a request into a path inside the menu directory
+
+        :param path: file name relative to the menu directory
+        :return: absolute path
+        """
+        if not isinstance(path, str):
+            raise HTTPError(400, "File names must be strings")
+        full_path = os.path.realpath(os.path.join(self.menu_dir, path))
+        if os.path.commonpath([full_path, self.menu_dir]) != self.menu_dir:
+            raise HTTPError(403, "{} is outside the menu directory".format(path))
+        return full_path
+
+    @staticmethod
+    def menu_version(path: str) -> tuple:
+        """Identifies the current contents of a menu file without reading it
+
+        :param path: csv file with meals
+        :return: tuple (path, modification time, size)
+        """
+        try:
+            info = os.stat(path)
+        except (FileNotFoundError, TypeError):
+            raise HTTPError(404, "Menu {} not found".format(path))
+        return path, info.st_mtime_ns, info.st_size
+
+    def get_menu(self, path: str):
+        """Returns the parsed menu, loading it again if the file changed
+
+        :param path: csv file with meals
+        :return: lunch_menu.Menu
+        """
+        key = self.menu_version(path)
+        if path not in self.menus or self.menus[path][0] != key:
+            try:
+                menu = lm.load_menu(path)
+            except OSError:
+                raise HTTPError(404, "Menu {} not found".format(path))
+            except FILE_ERRORS:
+                raise HTTPError(400, "Menu {} is not a meal file".format(path))
+            if menu == -1:
+                raise HTTPError(404, "Menu {} not found".format(path))
+            self.menus[path] = key, menu
+        return self.menus[path][1]
+
+    async def query(self, path: str, intervals: dict) -> dict:
+        """Finds the cheapest lunch, batching it with other queries for the same menu
+
+        :param path: csv file with meals, relative to the menu directory
+        :param intervals: dictionary with limit requirements
+        :return: dictionary with the lunch (list of meals) and its price, None if no lunch meets the limits
+        """
+        path = self.resolve(path)
+        version = self.menu_version(path)
+        found, result = self.cache.get(version, intervals)
+        if found:
+            return result
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self.pending.setdefault(path, list())
+        batch.append((lm.compile_intervals(intervals), future))
+        if len(batch) == 1:
+            loop.call_later(self.batch_window, lambda: asyncio.ensure_future(self._search(path)))
+        result = await future
+        self.cache.put(version, intervals, result)
+        return result
+
+    def _search_batch(self, path, specs):
+        menu = self.get_menu(path)
+        return [self._format(menu, rows, price) for rows, price in menu.find_best_rows_batch(specs)]
+
+    async def _search(self, path):
+        batch = self.pending.pop(path)
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self._search_batch, path, [s for s, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    @staticmethod
+    def _format(menu, rows, price):
+        if rows is None:
+            return {'lunch': None, 'price': None}
+
+        lunch = list()
+        for category, row in enumerate(rows):
+            values = {name: column[row] for name, column in menu.columns[category].items()}
+            lunch.append({name: value.item() if hasattr(value, 'item') else value for name, value in values.items()})
+        # rounded like Menu.result, so answers match find_best_meal
+        return {'lunch': lunch, 'price': float(np.round(price, 2))}
+
+    async def _route(self, method, target, body):
+        if method == 'GET' and target == '/health':
+            return {'status': 'ok', 'menus': len(self.menus), 'cache': self.cache.info()}
+        if target != '/best':
+            raise HTTPError(404, "Unknown path {}".format(target))
+        if method != 'POST':
+            raise HTTPError(405, "Use POST for {}".format(target))
+
+        try:
+            request = json.loads(body)
+            path = request['menu']
+        except (ValueError, KeyError, TypeError):
+            raise HTTPError(400, "Expected a JSON object with menu and intervals")
+
+        if 'intervals_file' in request:
+            try:
+                intervals = lm.load_intervals(self.resolve(request['intervals_file']))
+            except OSError:
+                intervals = -1
+            except FILE_ERRORS as e:
+                raise HTTPError(400, "Invalid intervals file {}: {}".format(request['intervals_file'], str(e).strip("'")))
+            if intervals == -1:
+                raise HTTPError(404, "Intervals {} not found".format(request['intervals_file']))
+        else:
+            intervals = parse_intervals(request.get('intervals'))
+        return await self.query(path, intervals)
+
+    async def handle(self, reader, writer):
+        """Answers one HTTP/1.1 request on the connection and closes it
+
+        :param reader: asyncio StreamReader
+        :param writer: asyncio StreamWriter
+        """
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = dict()
+            while True:
+                line = (await reader.readline()).decode('latin-1').strip()
+                if not line:
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            if len(request_line) != 3:
+                raise HTTPError(400, "Malformed request line")
+            length = int(headers.get('content-length', 0))
+            if length > MAX_BODY_SIZE:
+                raise HTTPError(413, "Request body too large")
+
+            body = await reader.readexactly(length)
+            status, response = 200, await self._route(request_line[0], request_line[1], body)
+        except HTTPError as e:
+            status, response = e.status, {'error': str(e)}
+        except (ValueError, asyncio.IncompleteReadError):
+            status, response = 400, {'error': "Malformed request"}
+        except Exception:
+            status, response = 500, {'error': "Internal server error"}
+
+        payload = json.dumps(response).encode()
+        writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+                     'Connection: close\r\n\r\n'.format(status, 'OK' if status == 200 else 'Error', len(payload))
+                     .encode('latin-1') + payload)
+        await writer.drain()
+        writer.close()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8080):
+        """Starts listening
+
+        :param host: interface to bind
+        :param port: port to bind, 0 picks a free one
+        :return: asyncio Server
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def serve(host, port, menu_dir):
+    service = LunchService(menu_dir=menu_dir)
+    server = await service.start(host, port)
+    print("Serving lunch queries on {}:{}".format(*server.sockets[0].getsockname()[:2]))
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lunch menu optimization service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--menu-dir', default='.', help='only menu and intervals files in this directory are served')
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.menu_dir))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+SCENARIOS = [
+    ('python only', 'pass'),
+    ('import numpy', 'import numpy'),
+    ('import pandas', 'import pandas'),
+    ('import lunch_menu', 'import lunch_menu'),
+    ('array query', (
+        'import lunch_menu as lm\n'
+        'menu = lm.load_menu({meals!r})\n'
+        'rows, price = menu.find_best_rows(lm.load_intervals({intervals!r}))\n'
+        'print([menu.names[c][r] for c, r in enumerate(rows)] if rows else None, round(price, 2))'
+    )),
+    ('pandas query', (
+        'import lunch_menu as lm\n'
+        'lunch, price = lm.main({meals!r}, {intervals!r})\n'
+        'print([meal.meal for meal in lunch] if lunch else None, price)'
+    )),
+]
+
+
+def time_cold_start(code, repeat) -> list[float]:
+    """Runs code in a fresh interpreter repeat times
+
+    :param code: python source
+    :param repeat: number of runs
+    :return: wall times in seconds
+    """
+    times = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=HERE, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold start times of lunch_menu queries')
+    parser.add_argument('meals', nargs='?', default=os.path.join(HERE, 'lunch_samples', 'meals1.csv'))
+    parser.add_argument('intervals', nargs='?', default=os.path.join(HERE, 'lunch_samples', 'intervals1.txt'))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print('{:<20}{:>12}{:>12}'.format('scenario', 'median ms', 'min ms'))
+    for name, code in SCENARIOS:
+        times = time_cold_start(code.format(meals=args.meals, intervals=args.intervals), args.repeat)
+        print('{:<20}{:>12.1f}{:>12.1f}'.format(name, statistics.median(times) * 1000, min(times) * 1000))
+
+
+if __name__ == '__main__':
+    main()
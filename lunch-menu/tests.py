@@ -1,6 +1,13 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+
 import numpy as np
 import pandas as pd
 
+import lunch_service
 import problem_1a as sol
 from test_constants_1a import *
 
@@ -38,6 +45,32 @@ def test_load_meals():
     print("Great news! load_meals() passed all tests!")
 
 
+def test_load_meals_chunked():
+    print("Testing load_meals_chunked()...")
+
+    for dset in DATASETS:
+        try:
+            res = sol.load_meals_chunked(dset, chunk_size=5)
+        except Exception:
+            print("\tIncorrect implementation; load_meals_chunked() produced an error")
+            return
+
+        if res == -1 or len(res) != 4:
+            print("\tWrong number of return values for load_meals_chunked(). Expected 4.")
+            return
+
+        for ret_value, correct in zip(res, sol.split_into_categories(sol.load_meals(dset))):
+            if list(ret_value.meal) != list(correct.meal):
+                print("\tIncorrectly split meals; expected {} got {}".format(list(correct.meal), list(ret_value.meal)))
+                return
+
+            if ret_value.dtypes["calories"] != np.float32:
+                print("\tNutrients should be loaded as float32, got {}".format(ret_value.dtypes["calories"]))
+                return
+
+    print("Great news! load_meals_chunked() passed all tests!")
+
+
 def test_split_into_categories():
     print("Testing split_into_categories()...")
 
@@ -90,6 +123,21 @@ def test_load_intervals():
             print("\tGot {}".format(res))
             return
 
+    with tempfile.TemporaryDirectory() as directory:
+        empty_file = os.path.join(directory, 'intervals.txt')
+        for content in ['', '\n\n']:
+            with open(empty_file, 'w') as interval_file:
+                interval_file.write(content)
+            try:
+                res = sol.load_intervals(empty_file)
+            except Exception:
+                print("\tIncorrect implementation; load_intervals() produced an error for an empty file")
+                return
+
+            if res != -1:
+                print("\tIncorrect return value; load_intervals() should return -1 for an empty file, got {}".format(res))
+                return
+
     print("Great news! load_intervals() passed all tests!")
 
 
@@ -217,6 +265,30 @@ def test_calculate_stats():
     print("Great news! calculate_stats() passed all tests!")
 
 
+def test_add_serving_stats():
+    print("Testing add_serving_stats()...")
+
+    for dset, stats in zip(DFRAMES, MEAL_STATS):
+        try:
+            res = sol.add_serving_stats(dset.copy())
+        except Exception:
+            print("\tIncorrect implementation; add_serving_stats() produced an error")
+            return
+
+        for idx, meal in res.iterrows():
+            meal_stats = stats[meal.meal]
+            for name in ["calories", "protein", "fat", "carbs"]:
+                if meal["serving_" + name] != meal_stats[name]:
+                    print("\tIncorrectly calculated {} for {}. Expected {}, got {}".format(name, meal.meal, meal_stats[name], meal["serving_" + name]))
+                    return
+
+            if sol.calculate_stats(meal) != tuple(meal_stats[name] for name in ["calories", "protein", "fat", "carbs"]):
+                print("\tcalculate_stats() does not use the per-serving columns for {}".format(meal.meal))
+                return
+
+    print("Great news! add_serving_stats() passed all tests!")
+
+
 def test_evaluate_lunch():
     print("Testing evaluate_lunch()...")
     for soup, main, side, dessert, intervals, correct in EVALUATE_EXAMPLES:
@@ -238,6 +310,28 @@ def test_evaluate_lunch():
     print("Great news! evaluate_lunch() passed all tests!")
 
 
+def test_interval_spec():
+    print("Testing IntervalSpec...")
+
+    for soup, main, side, dessert, intervals, correct in EVALUATE_EXAMPLES:
+        try:
+            spec = sol.IntervalSpec(intervals)
+            res = sol.evaluate_lunch(soup, main, side, dessert, spec)
+        except Exception:
+            print("\tIncorrect implementation; evaluate_lunch() produced an error for IntervalSpec")
+            return
+
+        if res != correct:
+            print("\tevaluate_lunch() returned wrong value for IntervalSpec. Expected {}, got {}.".format(correct, res))
+            return
+
+        if sol.compile_intervals(spec) is not spec:
+            print("\tcompile_intervals() should not compile an IntervalSpec again")
+            return
+
+    print("Great news! IntervalSpec passed all tests!")
+
+
 def test_get_lunch_price():
     print("Testing get_lunch_price()...")
 
@@ -297,6 +391,61 @@ def test_generate_combinations():
     print("Great news! generate_combinations() passed all tests!")
 
 
+def test_iter_combinations():
+    print("Testing iter_combinations()...")
+
+    for t_soups, t_mains, t_sides, t_desserts, correct in zip(SOUPS, MAINS, SIDES, DESSERTS, COMBINATION_NAMES):
+        meals = [t_soups, t_mains, t_sides, t_desserts]
+        try:
+            res = sol.iter_combinations(*meals, indices=True)
+        except Exception:
+            print("\tIncorrect implementation; iter_combinations() produced an error")
+            return
+
+        if isinstance(res, list):
+            print("\tIncorrect return type; iter_combinations() should not build a list")
+            return
+
+        names = [tuple(m.reset_index(drop=True).loc[i].meal for m, i in zip(meals, rows)) for rows in res]
+        if names != [tuple(elem.meal for elem in combo) for combo in sol.generate_combinations(*meals)]:
+            print("\tIncorrect combinations found; iter_combinations() does not follow generate_combinations()")
+            return
+
+        if sorted(names) != sorted(correct):
+            print("\tIncorrect combinations found; expected {} got {}".format(len(correct), len(names)))
+            return
+
+    print("Great news! iter_combinations() passed all tests!")
+
+
+def test_menu():
+    print("Testing Menu...")
+
+    for dframes in DFRAMES:
+        try:
+            menu = sol.Menu.from_meals(dframes)
+        except Exception:
+            print("\tIncorrect implementation; Menu.from_meals() produced an error")
+            return
+
+        if sum(menu.sizes()) != DSET_LENGTH:
+            print("\tMissing some rows in the menu. Expected a total of {} rows, got {}".format(DSET_LENGTH, sum(menu.sizes())))
+            return
+
+        for category, meals in enumerate(sol.split_into_categories(dframes)):
+            for handle in menu.handles(category):
+                meal = menu.meal(handle)
+                if type(meal) != pd.core.series.Series:
+                    print("\tIncorrect return type; Menu.meal() returned {} instead of pandas Series".format(type(meal)))
+                    return
+
+                if meal.meal != meals.loc[handle[1]].meal or menu.stats[category][handle[1]][-1] != meal.price:
+                    print("\tIncorrect meal for handle {}; expected {} got {}".format(handle, meals.loc[handle[1]].meal, meal.meal))
+                    return
+
+    print("Great news! Menu passed all tests!")
+
+
 def test_find_best_meal():
     print("Testing find_best_meal()...")
 
@@ -341,6 +490,477 @@ def test_find_best_meal():
     print("Great news! find_best_meal() passed all tests!")
 
 
+def _check_best_meal(name, solve) -> bool:
+    # compares the result of a search engine with find_best_meal, prices
+    # included - find_best_meal rounds them to 2 decimals
+    for soups, mains, sides, desserts, intervals, correct in FIND_BEST_EXAMPLES:
+        c_combo, _ = correct
+        try:
+            combo, price = solve(soups, mains, sides, desserts, intervals)
+        except Exception:
+            print("\tIncorrect implementation; {}() produced an error".format(name))
+            return False
+
+        _, c_price = sol.find_best_meal(soups, mains, sides, desserts, intervals)
+        if price != c_price:
+            print("\tIncorrect price of the best combination; expected {} got {}".format(c_price, price))
+            return False
+
+        if (combo is None) != (c_combo is None) or \
+                (combo is not None and [elem.meal for elem in combo] != [elem.meal for elem in c_combo]):
+            print("\tIncorrect combination found as best; expected {} got {}".format(c_combo, combo))
+            return False
+    return True
+
+
+def test_find_best_meal_vectorized():
+    print("Testing find_best_meal_vectorized()...")
+
+    def solve(*args):
+        return sol.find_best_meal_vectorized(*args, chunk_size=5)
+
+    if _check_best_meal('find_best_meal_vectorized', solve):
+        print("Great news! find_best_meal_vectorized() passed all tests!")
+
+
+def test_find_best_meal_bnb():
+    print("Testing find_best_meal_bnb()...")
+
+    if _check_best_meal('find_best_meal_bnb', sol.find_best_meal_bnb):
+        print("Great news! find_best_meal_bnb() passed all tests!")
+
+
+def test_find_best_meal_ip():
+    print("Testing find_best_meal_ip()...")
+
+    def solve_fiber(soups, mains, sides, desserts, intervals):
+        # an extra nutrient column with a limit every lunch meets must not change the answer
+        frames = [meals.assign(fiber=meals['amount'] % 7) for meals in [soups, mains, sides, desserts]]
+        return sol.find_best_meal_ip(*frames, dict(intervals, fiber=(0, 10 ** 6)))
+
+    if _check_best_meal('find_best_meal_ip', sol.find_best_meal_ip) and \
+            _check_best_meal('find_best_meal_ip', solve_fiber):
+        print("Great news! find_best_meal_ip() passed all tests!")
+
+
+def test_find_best_meal_mitm():
+    print("Testing find_best_meal_mitm()...")
+
+    if _check_best_meal('find_best_meal_mitm', sol.find_best_meal_mitm):
+        print("Great news! find_best_meal_mitm() passed all tests!")
+
+
+def test_find_best_meals():
+    print("Testing find_best_meals()...")
+
+    for soups, mains, sides, desserts, intervals, correct in FIND_BEST_EXAMPLES:
+        _, c_price = sol.find_best_meal(soups, mains, sides, desserts, intervals)
+        try:
+            res = sol.find_best_meals(soups, mains, sides, desserts, intervals, k=3, tie_breaker='protein')
+            empty = sol.find_best_meals(soups, mains, sides, desserts, intervals, k=0)
+        except Exception:
+            print("\tIncorrect implementation; find_best_meals() produced an error")
+            return
+
+        if type(res) != list or not 0 < len(res) <= 3:
+            print("\tIncorrect return value; find_best_meals() should return a list of at most 3 lunches")
+            return
+
+        if empty != []:
+            print("\tIncorrect return value; find_best_meals() should return an empty list for k=0, got {}".format(empty))
+            return
+
+        prices = [price for combo, price in res]
+        if prices != sorted(prices):
+            print("\tIncorrect order; lunches should be sorted by price, got {}".format(prices))
+            return
+
+        if prices[0] != c_price:
+            print("\tIncorrect price of the best combination; expected {} got {}".format(c_price, prices[0]))
+            return
+
+        for combo, price in res:
+            if not sol.evaluate_lunch(*combo, intervals):
+                print("\tIncorrect combination found; {} does not meet the limits".format([elem.meal for elem in combo]))
+                return
+
+    # the a lunch costs 0.6 + 2.6 + 0.7 + 0.2 = 4.1000000000000005 and the b lunch 4.1,
+    # both are reported at 4.1 so the tie breaker decides
+    frames = [pd.DataFrame({'meal': [category + ' a', category + ' b'], 'category': category,
+                            'calories': [100, 100], 'protein': [protein, 1], 'fat': [1, 1], 'carbs': [1, 1],
+                            'amount': [100, 100], 'price': prices})
+              for category, protein, prices in zip(sol.MEAL_CATEGORIES, [50, 1, 1, 1],
+                                                   [[0.6, 1.0], [2.6, 1.0], [0.7, 1.0], [0.2, 1.1]])]
+    wide = {'calories': (0, 10000), 'protein': (0, 10000), 'fat': (0, 10000), 'carbs': (0, 10000), 'price': (0.0, 100.0)}
+    for descending in [False, True]:
+        res = sol.find_best_meals(*frames, wide, k=16, tie_breaker='protein', descending=descending)
+        ties = [[elem.meal for elem in combo] for combo, price in res if price == 4.1]
+        expected = [[meal + (' a' if descending else ' b') for meal in sol.MEAL_CATEGORIES],
+                    [meal + (' b' if descending else ' a') for meal in sol.MEAL_CATEGORIES]]
+        if ties != expected:
+            print("\tIncorrect order of lunches with the same price; expected {} got {}".format(expected, ties))
+            return
+
+    print("Great news! find_best_meals() passed all tests!")
+
+
+def test_prune_meals():
+    print("Testing prune_meals()...")
+
+    for soups, mains, sides, desserts, intervals, correct in FIND_BEST_EXAMPLES:
+        c_combo, _ = correct
+        try:
+            pruned, report = sol.prune_meals(soups, mains, sides, desserts, intervals)
+            combo, price = sol.find_best_meal(*pruned, intervals)
+            _, c_price = sol.find_best_meal(soups, mains, sides, desserts, intervals)
+        except Exception:
+            print("\tIncorrect implementation; prune_meals() produced an error")
+            return
+
+        if report['sizes'] != (len(soups), len(mains), len(sides), len(desserts)) or \
+                report['pruned_sizes'] != tuple(len(meals) for meals in pruned):
+            print("\tIncorrect report; meal counts do not match the dataframes: {}".format(report))
+            return
+
+        if report['pruned_combinations'] > report['combinations']:
+            print("\tIncorrect report; pruning should not add combinations: {}".format(report))
+            return
+
+        if price != c_price:
+            print("\tIncorrect price of the best combination after pruning; expected {} got {}".format(c_price, price))
+            return
+
+        if (combo is None) != (c_combo is None) or \
+                (combo is not None and [elem.meal for elem in combo] != [elem.meal for elem in c_combo]):
+            print("\tIncorrect combination found after pruning; expected {} got {}".format(c_combo, combo))
+            return
+
+    print("Great news! prune_meals() passed all tests!")
+
+
+def test_find_best_meal_batch():
+    print("Testing find_best_meal_batch()...")
+
+    for soups, mains, sides, desserts, intervals, correct in FIND_BEST_EXAMPLES:
+        intervals_list = [interval for *_, interval, _ in FIND_BEST_EXAMPLES]
+        try:
+            res = sol.find_best_meal_batch(soups, mains, sides, desserts, intervals_list, chunk_size=20)
+        except Exception:
+            print("\tIncorrect implementation; find_best_meal_batch() produced an error")
+            return
+
+        if len(res) != len(intervals_list):
+            print("\tIncorrect return value; expected {} results got {}".format(len(intervals_list), len(res)))
+            return
+
+        for interval, (combo, price) in zip(intervals_list, res):
+            c_combo, c_price = sol.find_best_meal(soups, mains, sides, desserts, interval)
+            if price != c_price:
+                print("\tIncorrect price of the best combination; expected {} got {}".format(c_price, price))
+                return
+
+            if c_combo is not None and [elem.meal for elem in combo] != [elem.meal for elem in c_combo]:
+                print("\tIncorrect combination found as best; expected {} got {}".format(c_combo, combo))
+                return
+
+    print("Great news! find_best_meal_batch() passed all tests!")
+
+
+def test_find_best_meal_parallel():
+    print("Testing find_best_meal_parallel()...")
+
+    def solve(*args):
+        return sol.find_best_meal_parallel(*args, workers=2)
+
+    if _check_best_meal('find_best_meal_parallel', solve):
+        print("Great news! find_best_meal_parallel() passed all tests!")
+
+
+def test_lunch_optimizer():
+    print("Testing LunchOptimizer...")
+
+    for dframes, intervals in zip(DFRAMES, LOADED_INTERVALS):
+        try:
+            optimizer = sol.LunchOptimizer(*sol.split_into_categories(dframes), intervals)
+            combo, price = optimizer.best_lunch()
+        except Exception:
+            print("\tIncorrect implementation; LunchOptimizer produced an error")
+            return
+
+        while combo is not None:
+            c_combo, c_price = sol.find_best_meal(*sol.split_into_categories(dframes), intervals)
+            if price != c_price or [elem.meal for elem in combo] != [elem.meal for elem in c_combo]:
+                print("\tIncorrect combination found as best; expected {} got {}".format(c_combo, combo))
+                return
+
+            main_dish = combo[1]
+            dframes = dframes[dframes.meal != main_dish.meal]
+            combo, price = optimizer.remove_meal(main_dish.category, main_dish.meal)
+
+    print("Great news! LunchOptimizer passed all tests!")
+
+
+def test_plan_week():
+    print("Testing plan_week()...")
+
+    days = list(zip(DFRAMES, LOADED_INTERVALS))
+    try:
+        week, total = sol.plan_week(days, no_repeat=())
+        repeat_week, repeat_total = sol.plan_week(days)
+    except Exception:
+        print("\tIncorrect implementation; plan_week() produced an error")
+        return
+
+    correct = [sol.find_best_meal(*sol.split_into_categories(dframes), intervals) for dframes, intervals in days]
+    if any(combo is None for combo, _ in correct):
+        if week is not None:
+            print("\tIncorrect plan; some day has no lunch meeting the limits, expected None got {}".format(week))
+            return
+    else:
+        for (combo, price), (c_combo, c_price) in zip(week, correct):
+            if price != c_price or [elem.meal for elem in combo] != [elem.meal for elem in c_combo]:
+                print("\tIncorrect lunch without repeat limits; expected {} got {}".format(c_combo, combo))
+                return
+
+            if [list(elem.index) for elem in combo] != [list(elem.index) for elem in c_combo]:
+                print("\tIncorrect meal columns; expected {} got {}".format(list(c_combo[0].index), list(combo[0].index)))
+                return
+
+    if repeat_week is not None:
+        mains = [combo[1].meal for combo, _ in repeat_week]
+        if len(set(mains)) != len(mains):
+            print("\tIncorrect plan; main dishes repeat during the week: {}".format(mains))
+            return
+
+        for (combo, price), (_, intervals) in zip(repeat_week, days):
+            if not sol.evaluate_lunch(*combo, intervals):
+                print("\tIncorrect plan; {} does not meet the limits".format([elem.meal for elem in combo]))
+                return
+
+        if repeat_total != round(sum(price for _, price in repeat_week), 2):
+            print("\tIncorrect price of the week; expected {} got {}".format(
+                round(sum(price for _, price in repeat_week), 2), repeat_total))
+            return
+
+    print("Great news! plan_week() passed all tests!")
+
+
+def test_load_menu_cached():
+    print("Testing load_menu_cached()...")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for dset, intervals in zip(DATASETS, LOADED_INTERVALS):
+            correct = sol.Menu.from_meals(sol.load_meals(dset))
+            for _ in range(2):
+                try:
+                    res = sol.load_menu_cached(dset, cache_dir)
+                except Exception:
+                    print("\tIncorrect implementation; load_menu_cached() produced an error")
+                    return
+
+                if not isinstance(res, sol.Menu):
+                    print("\tIncorrect return type; load_menu_cached() should return a Menu, got {}".format(type(res)))
+                    return
+
+                for names, c_names, stats, c_stats in zip(res.names, correct.names, res.stats, correct.stats):
+                    if list(names) != list(c_names) or not np.array_equal(stats, c_stats):
+                        print("\tIncorrectly cached menu for {}".format(dset))
+                        return
+
+    print("Great news! load_menu_cached() passed all tests!")
+
+
+def test_load_menu():
+    print("Testing load_menu()...")
+
+    for dset in DATASETS:
+        try:
+            res = sol.load_menu(dset)
+        except Exception:
+            print("\tIncorrect implementation; load_menu() produced an error")
+            return
+
+        if not isinstance(res, sol.Menu):
+            print("\tIncorrect return type; load_menu() should return a Menu, got {}".format(type(res)))
+            return
+
+        correct = sol.Menu.from_meals(sol.load_meals(dset))
+        for names, c_names, stats, c_stats in zip(res.names, correct.names, res.stats, correct.stats):
+            if list(names) != list(c_names) or not np.array_equal(stats, c_stats):
+                print("\tIncorrectly loaded menu for {}".format(dset))
+                return
+
+    # missing values are read as 0 like load_meals reads them
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'meals.csv')
+        with open(path, 'w') as meal_file:
+            meal_file.write('meal,category,calories,protein,fat,carbs,amount,price\n'
+                            'leek soup,soup,nan,3.5,NA,10,300,0.7\n'
+                            'goulash,main dish,120,,N/A,12.5,350,NaN\n'
+                            'rice,sidedish,130,2.5,null,28,200,0.5\n'
+                            'apple,dessert,52,0.3,0.2,14,150,0.4\n')
+        try:
+            res = sol.load_menu(path)
+        except Exception:
+            print("\tIncorrect implementation; load_menu() produced an error on missing values")
+            return
+
+        correct = sol.Menu.from_meals(sol.load_meals(path))
+        for stats, c_stats in zip(res.stats, correct.stats):
+            if not np.array_equal(stats, c_stats):
+                print("\tIncorrectly loaded missing values; expected {} got {}".format(correct.stats, res.stats))
+                return
+
+        intervals_path = os.path.join(directory, 'intervals.txt')
+        with open(intervals_path, 'w') as interval_file:
+            interval_file.write('calories,0,1000\nprotein,0,1000\nfat,0,1000\ncarbs,0,1000\nprice,0.0,10.0\n')
+        c_combo, c_price = sol.main(path, intervals_path)
+        if sol.quick_main(path, intervals_path) != ([elem.meal for elem in c_combo], c_price):
+            print("\tquick_main() and main() disagree on a menu with missing values")
+            return
+
+    print("Great news! load_menu() passed all tests!")
+
+
+def test_quick_main():
+    print("Testing quick_main()...")
+
+    for dset, intervals in zip(DATASETS, INTERVALS):
+        try:
+            names, price = sol.quick_main(dset, intervals)
+        except Exception:
+            print("\tIncorrect implementation; quick_main() produced an error")
+            return
+
+        c_combo, c_price = sol.main(dset, intervals)
+        c_names = None if c_combo is None else [elem.meal for elem in c_combo]
+        if (names, price) != (c_names, c_price):
+            print("\tIncorrect combination found as best; expected {} got {}".format((c_names, c_price), (names, price)))
+            return
+
+    print("Great news! quick_main() passed all tests!")
+
+
+async def _service_request(port, body):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    payload = json.dumps(body).encode()
+    writer.write("POST /best HTTP/1.1\r\nContent-Length: {}\r\n\r\n".format(len(payload)).encode() + payload)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+async def _query_service(requests, menu_dir='.'):
+    server = await lunch_service.LunchService(menu_dir=menu_dir).start('127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await asyncio.gather(*(_service_request(port, body) for body in requests))
+    finally:
+        server.close()
+
+
+def test_lunch_service():
+    print("Testing LunchService...")
+
+    requests = [{"menu": dset, "intervals": {key: list(value) for key, value in intervals.items()}}
+                for dset in DATASETS for intervals in LOADED_INTERVALS]
+    try:
+        responses = asyncio.run(_query_service(requests))
+    except Exception:
+        print("\tIncorrect implementation; LunchService produced an error")
+        return
+
+    for request, (status, response) in zip(requests, responses):
+        intervals = {key: tuple(value) for key, value in request["intervals"].items()}
+        c_combo, c_price = sol.find_best_meal(*sol.split_into_categories(sol.load_meals(request["menu"])), intervals)
+        if status != 200:
+            print("\tLunchService answered {} with status {}: {}".format(request, status, response))
+            return
+
+        if c_combo is None:
+            if response["lunch"] is not None:
+                print("\tLunchService found a lunch where find_best_meal did not: {}".format(response))
+                return
+            continue
+
+        if response["price"] != c_price or [meal["meal"] for meal in response["lunch"]] != [elem.meal for elem in c_combo]:
+            print("\tIncorrect combination found as best; expected {} got {}".format(c_combo, response))
+            return
+
+    intervals = {key: list(value) for key, value in LOADED_INTERVALS[0].items()}
+    with tempfile.TemporaryDirectory() as menu_dir:
+        shutil.copy(DATASETS[0], os.path.join(menu_dir, 'meals.csv'))
+        with open(os.path.join(menu_dir, 'intervals.txt'), 'w') as interval_file:
+            interval_file.write('calories,0,1000\n')
+        # the lunch costs 0.015, find_best_meal reports 0.02
+        with open(os.path.join(menu_dir, 'cheap.csv'), 'w') as meal_file:
+            meal_file.write('meal,category,calories,protein,fat,carbs,amount,price\n')
+            for category, price in zip(sol.MEAL_CATEGORIES, [0.005, 0.005, 0.004, 0.001]):
+                meal_file.write('{0} meal,{0},100,10,10,10,100,{1}\n'.format(category, price))
+        wide = {key: [0, 1000] for key in sol.STAT_NAMES[:-1]}
+        wide['price'] = [0.0, 10.0]
+
+        # missing interval keys, a file that is not a menu, a file outside the menu directory, a missing menu
+        invalid = [({"menu": "meals.csv", "intervals_file": "intervals.txt"}, 400),
+                   ({"menu": "intervals.txt", "intervals": intervals}, 400),
+                   ({"menu": os.path.join("..", "meals.csv"), "intervals": intervals}, 403),
+                   ({"menu": "missing.csv", "intervals": intervals}, 404)]
+        try:
+            responses = asyncio.run(_query_service([request for request, _ in invalid], menu_dir))
+            (_, cheap), = asyncio.run(_query_service([{"menu": "cheap.csv", "intervals": wide}], menu_dir))
+        except Exception:
+            print("\tIncorrect implementation; LunchService produced an error")
+            return
+
+        _, c_price = sol.find_best_meal(*sol.split_into_categories(sol.load_meals(os.path.join(menu_dir, 'cheap.csv'))),
+                                        {key: tuple(value) for key, value in wide.items()})
+        if cheap.get("price") != c_price:
+            print("\tIncorrect price of the best combination; expected {} got {}".format(c_price, cheap))
+            return
+
+    for (request, c_status), (status, response) in zip(invalid, responses):
+        if status != c_status or "error" not in response:
+            print("\tLunchService answered {} with status {}, expected {}: {}".format(request, status, c_status, response))
+            return
+
+    print("Great news! LunchService passed all tests!")
+
+
+def test_query_cache():
+    print("Testing QueryCache...")
+
+    cache = sol.QueryCache(maxsize=len(LOADED_INTERVALS))
+    for dframes in DFRAMES:
+        categories = sol.split_into_categories(dframes)
+        for _ in range(2):
+            for intervals in LOADED_INTERVALS:
+                try:
+                    combo, price = cache.find_best_meal(*categories, intervals)
+                except Exception:
+                    print("\tIncorrect implementation; QueryCache.find_best_meal() produced an error")
+                    return
+
+                c_combo, c_price = sol.find_best_meal(*categories, intervals)
+                if price != c_price or (combo is None) != (c_combo is None) or \
+                        (combo is not None and [elem.meal for elem in combo] != [elem.meal for elem in c_combo]):
+                    print("\tIncorrect combination found as best; expected {} got {}".format(c_combo, combo))
+                    return
+
+    info = cache.info()
+    queries = 2 * len(DFRAMES) * len(LOADED_INTERVALS)
+    if info['hits'] + info['misses'] != queries or info['size'] > info['maxsize']:
+        print("\tIncorrect cache statistics {} after {} queries".format(info, queries))
+        return
+
+    if info['hits'] < len(DFRAMES) * len(set(map(sol.interval_key, LOADED_INTERVALS))) - info['evictions']:
+        print("\tRepeated queries were not answered from the cache: {}".format(info))
+        return
+
+    print("Great news! QueryCache passed all tests!")
+
+
 def main():
     test_load_meals()
     print()
@@ -348,6 +968,15 @@ def main():
     test_split_into_categories()
     print()
 
+    test_load_meals_chunked()
+    print()
+
+    test_load_menu_cached()
+    print()
+
+    test_load_menu()
+    print()
+
     test_load_intervals()
     print()
 
@@ -357,18 +986,69 @@ def main():
     test_calculate_stats()
     print()
 
+    test_add_serving_stats()
+    print()
+
     test_evaluate_lunch()
     print()
 
+    test_interval_spec()
+    print()
+
     test_get_lunch_price()
     print()
 
     test_generate_combinations()
     print()
 
+    test_iter_combinations()
+    print()
+
+    test_menu()
+    print()
+
     test_find_best_meal()
     print()
 
+    test_find_best_meals()
+    print()
+
+    test_prune_meals()
+    print()
+
+    test_find_best_meal_vectorized()
+    print()
+
+    test_find_best_meal_batch()
+    print()
+
+    test_find_best_meal_bnb()
+    print()
+
+    test_find_best_meal_ip()
+    print()
+
+    test_find_best_meal_mitm()
+    print()
+
+    test_find_best_meal_parallel()
+    print()
+
+    test_lunch_optimizer()
+    print()
+
+    test_query_cache()
+    print()
+
+    test_plan_week()
+    print()
+
+    test_lunch_service()
+    print()
+
+    test_quick_main()
+    print()
+
 
 if __name__ == '__main__':
     main()
@@ -1,3 +1,6 @@
+import math
+import tempfile
+from collections import Counter
 from copy import deepcopy
 
 import problem_1b as sol
@@ -348,6 +351,193 @@ def test_smart_process_result():
     print("Great news! smart_process_result() passed all tests!")
 
 
+def test_filter_words():
+    print("Testing filter_words()...")
+
+    for player_words, player_knowledge, correct in AVAILABLE_EXAMPLES + SMART_AVAILABLE_EXAMPLES:
+        try:
+            index = sol.WordIndex(player_words)
+            res = sol.filter_words(player_words, player_knowledge, index)
+        except Exception as e:
+            print("\tIncorrect implementation! filter_words() generated an error!")
+            print(e)
+            return
+
+        if type(res) != list:
+            print("\tIncorrect return type! Possible solutions should be returned in a list (got {})!".format(type(res)))
+            return
+
+        if sorted(res) != sorted(correct):
+            print("\tIncorrect return value! Expected {} for knowledge {}, got {}".format(correct, player_knowledge, res))
+            return
+
+        if sol.filter_words(player_words, player_knowledge) != res:
+            print("\tIncorrect implementation! filter_words() should not depend on a prebuilt index")
+            return
+
+    print("Great news! filter_words() passed all tests!")
+
+
+def test_feedback_matrix():
+    print("Testing feedback_matrix()...")
+
+    for dset_file, word_list in zip(TEST_DATASETS, DATASETS):
+        try:
+            matrix = sol.feedback_matrix(word_list)
+            with tempfile.TemporaryDirectory() as cache_dir:
+                sol.load_feedback_matrix(dset_file, cache_dir)
+                words, cached = sol.load_feedback_matrix(dset_file, cache_dir)
+                cached = cached.copy()
+        except Exception as e:
+            print("\tIncorrect implementation! feedback_matrix() generated an error!")
+            print(e)
+            return
+
+        if matrix.shape != (len(word_list), len(word_list)):
+            print("\tIncorrect return value! Expected a {0}x{0} matrix, got {1}".format(len(word_list), matrix.shape))
+            return
+
+        for i, guess in enumerate(word_list):
+            for j, puzzle in enumerate(word_list):
+                correct = sol.evaluate_guess(guess, puzzle)
+                if sol.unpack_pattern(matrix[i, j], guess) != correct or sol.pattern_of(correct) != matrix[i, j]:
+                    print("\tIncorrect pattern for guess {} and puzzle {}: {}, expected {}".format(
+                        guess, puzzle, sol.unpack_pattern(matrix[i, j], guess), correct))
+                    return
+
+            if list(sol.feedback_patterns(guess, word_list)) != list(matrix[i]):
+                print("\tIncorrect return value! feedback_patterns() differs from the matrix row for {}".format(guess))
+                return
+
+        if words != word_list or (cached != matrix).any():
+            print("\tIncorrect return value! load_feedback_matrix() returned a different matrix for {}".format(dset_file))
+            return
+
+    print("Great news! feedback_matrix() passed all tests!")
+
+
+def _entropy(guess, words):
+    counts = Counter(str(sol.evaluate_guess(guess, word)) for word in words)
+    return -sum(n / len(words) * math.log2(n / len(words)) for n in counts.values())
+
+
+def test_get_entropy_player_guess():
+    print("Testing get_entropy_player_guess()...")
+
+    for player_words, player_knowledge, correct in AVAILABLE_EXAMPLES + SMART_AVAILABLE_EXAMPLES:
+        try:
+            words, guess = sol.get_entropy_player_guess(player_words, player_knowledge)
+        except Exception as e:
+            print("\tIncorrect implementation! get_entropy_player_guess() generated an error!")
+            print(e)
+            return
+
+        if sorted(words) != sorted(correct):
+            print("\tIncorrect return value! Expected {} for knowledge {}, got {}".format(correct, player_knowledge, words))
+            return
+
+        best = max(_entropy(word, words) for word in words)
+        if guess not in words or _entropy(guess, words) < best - 1e-9:
+            print("\tIncorrect guess! {} does not split {} the most evenly".format(guess, words))
+            return
+
+    for dset_file, word_list in zip(TEST_DATASETS, DATASETS):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            guesser = sol.entropy_guesser(dset_file, cache_dir)
+            knowledge = deepcopy(sol.PLAYER_KNOWLEDGE)
+            if guesser(word_list, knowledge) != sol.get_entropy_player_guess(word_list, knowledge):
+                print("\tIncorrect implementation! entropy_guesser() should guess like get_entropy_player_guess()")
+                return
+
+    print("Great news! get_entropy_player_guess() passed all tests!")
+
+
+def test_constraint_process_result():
+    print("Testing constraint_process_result()...")
+
+    for word_list in DATASETS:
+        for puzzle in word_list:
+            knowledge = deepcopy(sol.CONSTRAINT_KNOWLEDGE)
+            seen = list()
+            for guess in word_list:
+                result = sol.evaluate_guess(guess, puzzle)
+                seen.append((guess, result))
+                try:
+                    sol.constraint_process_result(result, knowledge)
+                    words = sol.filter_words(word_list, knowledge)
+                except Exception as e:
+                    print("\tIncorrect implementation! constraint_process_result() generated an error!")
+                    print(e)
+                    return
+
+                correct = [word for word in word_list
+                           if all(sol.evaluate_guess(g, word) == r for g, r in seen)]
+                if words != correct:
+                    print("\tIncorrect knowledge! Expected {} after {}, got {}".format(correct, seen, words))
+                    return
+
+    knowledge = deepcopy(sol.CONSTRAINT_KNOWLEDGE)
+    for guess in ("eerie", "tweet"):
+        sol.constraint_process_result(sol.evaluate_guess(guess, "there"), knowledge)
+    code = ord('e') - ord('a')
+    if knowledge['min'][code] != 2 or knowledge['max'][ord('i') - ord('a')] != 0:
+        print("\tIncorrect knowledge! Expected at least two e and no i, got {}".format(knowledge))
+        return
+
+    print("Great news! constraint_process_result() passed all tests!")
+
+
+def test_play_game():
+    print("Testing play_game()...")
+
+    for word_list in DATASETS:
+        for strategy in sol.STRATEGIES:
+            for puzzle in word_list:
+                try:
+                    guesses = sol.play_game(puzzle, word_list, strategy)
+                except Exception as e:
+                    print("\tIncorrect implementation! play_game() generated an error!")
+                    print(e)
+                    return
+
+                if not 1 <= guesses <= len(word_list):
+                    print("\tIncorrect return value! {} guesses for {} with {} strategy".format(guesses, puzzle, strategy))
+                    return
+
+    print("Great news! play_game() passed all tests!")
+
+
+def test_simulate():
+    print("Testing simulate()...")
+
+    for dset_file, word_list in zip(TEST_DATASETS, DATASETS):
+        for strategy in sol.STRATEGIES:
+            with tempfile.TemporaryDirectory() as cache_dir:
+                try:
+                    report = sol.simulate(dset_file, strategy, workers=1, cache_dir=cache_dir)
+                    sampled = sol.simulate(dset_file, strategy, games=7, workers=2, seed=1, cache_dir=cache_dir)
+                except Exception as e:
+                    print("\tIncorrect implementation! simulate() generated an error!")
+                    print(e)
+                    return
+
+            distribution = report['distribution']
+            if report['games'] != len(word_list) or sum(distribution.values()) != len(word_list):
+                print("\tIncorrect return value! Expected {} games, got {}".format(len(word_list), report))
+                return
+            if sampled['games'] != 7 or sum(sampled['distribution'].values()) != 7:
+                print("\tIncorrect return value! Expected 7 games, got {}".format(sampled))
+                return
+
+            mean = sum(n * count for n, count in distribution.items()) / len(word_list)
+            fails = sum(count for n, count in distribution.items() if n > sol.MAX_GUESSES) / len(word_list)
+            if not math.isclose(report['mean'], mean) or not math.isclose(report['fail_rate'], fails):
+                print("\tIncorrect return value! Mean and fail rate do not match {}".format(distribution))
+                return
+
+    print("Great news! simulate() passed all tests!")
+
+
 def main():
     test_load_words()
     print()
@@ -373,6 +563,24 @@ def main():
     test_smart_process_result()
     print()
 
+    test_filter_words()
+    print()
+
+    test_feedback_matrix()
+    print()
+
+    test_get_entropy_player_guess()
+    print()
+
+    test_constraint_process_result()
+    print()
+
+    test_play_game()
+    print()
+
+    test_simulate()
+    print()
+
 
 if __name__ == '__main__':
     main()
@@ -1,11 +1,36 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
+from functools import cached_property, partial
+import hashlib
+import os
 import random
 import string
+import time
+
+import numpy as np
 
 PLAYER_KNOWLEDGE = [(letter, None, -1)
                     for letter in string.ascii_lowercase]
 SMART_PLAYER_KNOWLEDGE = [[letter, None, [0, 1, 2, 3, 4]]
                           for letter in string.ascii_lowercase]
+# 26-bit mask of every letter, bit 0 for a ... bit 25 for z
+ALL_LETTERS = (1 << len(string.ascii_lowercase)) - 1
+# allowed - mask of the letters possible at every position,
+# min and max - bounds of how many times every letter occurs in the solution
+CONSTRAINT_KNOWLEDGE = {'allowed': [ALL_LETTERS] * 5,
+                        'min': [0] * len(string.ascii_lowercase),
+                        'max': [5] * len(string.ascii_lowercase)}
+# a game needing more guesses counts as lost
+MAX_GUESSES = 6
+# feedback digits of a packed pattern, position 0 is the least significant base 3 digit
+ABSENT, PRESENT, CORRECT = 0, 1, 2
+# number of different patterns of a 5 letter guess
+PATTERN_COUNT = 3 ** 5
+# get_entropy_player_guess only remembers guesses for at least this many remaining words
+MEMO_MIN_WORDS = 64
+# directory created next to a dataset by load_feedback_matrix
+PATTERN_CACHE_DIR = '.pattern_cache'
 
 
 def load_words(dataset_path) -> list:
@@ -52,6 +77,202 @@ def evaluate_guess(guess, puzzle) -> list[tuple]:
     return result
 
 
+class WordIndex:
+    def __init__(self, word_list):
+        """Constructor - encodes every word as per-position letter codes
+        (0 for a ... 25 for z) and a 26-bit mask of the letters it contains,
+        so knowledge filters are array operations over the whole list
+
+        :param word_list: list of strings 5 letters long
+        """
+        self.words = list(word_list)
+        self.positions = {word: i for i, word in enumerate(self.words)}
+        width = len(self.words[0]) if self.words else 5
+        text = ''.join(self.words).lower().encode('ascii')
+        self.codes = (np.frombuffer(text, dtype=np.uint8).reshape(len(self.words), width) - ord('a')).astype(np.uint8)
+        self.bits = np.left_shift(np.uint32(1), self.codes.astype(np.uint32))
+        self.masks = np.bitwise_or.reduce(self.bits, axis=1) if width else np.zeros(len(self.words), dtype=np.uint32)
+
+    @cached_property
+    def counts(self):
+        """Matrix of how many times every letter (column) occurs in every word (row),
+        built on first use
+
+        :return: numpy array of uint8 with 26 columns
+        """
+        counts = np.zeros((len(self.words), 26), dtype=np.uint8)
+        rows = np.arange(len(self.words))
+        for position in range(self.codes.shape[1]):
+            counts[rows, self.codes[:, position]] += 1
+        return counts
+
+    def letters_at(self, positions):
+        """Masks of the letters every word has at the given positions
+
+        :param positions: list of indices into the word
+        :return: numpy array of 26-bit masks, one per word
+        """
+        return np.bitwise_or.reduce(self.bits[:, list(positions)], axis=1)
+
+    def filter(self, knowledge):
+        """Finds the words that can still be the solution, the same way
+        get_player_guess or get_smart_player_guess eliminate them: letters
+        known to be in (or not in) the solution are collected into one mask
+        per set of positions and checked together
+
+        :param knowledge: structure of PLAYER_KNOWLEDGE, SMART_PLAYER_KNOWLEDGE or CONSTRAINT_KNOWLEDGE
+        :return: numpy array of booleans, True for words that are kept
+        """
+        if isinstance(knowledge, dict):
+            return self.filter_constraints(knowledge)
+
+        keep = np.ones(len(self.words), dtype=bool)
+        required, forbidden = dict(), dict()
+
+        for let, con, pos in knowledge:
+            code = ord(let) - ord('a')
+            if isinstance(pos, list):
+                positions = tuple(pos)
+            else:
+                positions = None
+                if pos != -1:
+                    keep &= self.codes[:, pos] == code
+            if con is not None:
+                letters = required if con else forbidden
+                letters[positions] = letters.get(positions, 0) | (1 << code)
+
+        for positions in set(required) | set(forbidden):
+            letters = self.masks if positions is None else self.letters_at(positions)
+            needed = required.get(positions, 0)
+            keep &= (letters & needed) == needed
+            keep &= (letters & forbidden.get(positions, 0)) == 0
+        return keep
+
+    def filter_constraints(self, knowledge):
+        """Finds the words whose letters are allowed at every position and
+        whose letter counts are within the bounds
+
+        :param knowledge: structure of CONSTRAINT_KNOWLEDGE
+        :return: numpy array of booleans, True for words that are kept
+        """
+        allowed = np.array(knowledge['allowed'], dtype=np.uint32)[:self.bits.shape[1]]
+        keep = np.all(self.bits & allowed, axis=1)
+
+        low, high = np.array(knowledge['min']), np.array(knowledge['max'])
+        letters = np.flatnonzero((low > 0) | (high < self.bits.shape[1]))
+        if len(letters):
+            counts = self.counts[:, letters]
+            keep &= np.all((counts >= low[letters]) & (counts <= high[letters]), axis=1)
+        return keep
+
+    def select(self, keep) -> list:
+        """Words selected by a boolean mask
+
+        :param keep: numpy array of booleans, e.g. from filter
+        :return: list of strings in word list order
+        """
+        return [self.words[i] for i in np.flatnonzero(keep)]
+
+
+def filter_words(word_list, knowledge, index=None) -> list:
+    """Removes words that cannot be the correct solution based on the knowledge
+
+    :param word_list: list of strings 5 letters long
+    :param knowledge: structure of PLAYER_KNOWLEDGE, SMART_PLAYER_KNOWLEDGE or CONSTRAINT_KNOWLEDGE
+    :param index: WordIndex of word_list, built when None
+    :return: list of available words after elimination
+    """
+    if index is None:
+        index = WordIndex(word_list)
+    return index.select(index.filter(knowledge))
+
+
+def pattern_of(result) -> int:
+    """Packs the output of evaluate_guess into a base 3 number
+
+    :param result: output from evaluate_guess
+    :return: int - sum of CORRECT, PRESENT or ABSENT of every letter times 3 ** position
+    """
+    return sum((CORRECT if pos else PRESENT if con else ABSENT) * 3 ** idx
+               for idx, (_, con, pos) in enumerate(result))
+
+
+def unpack_pattern(pattern, guess) -> list[tuple]:
+    """Inverse of pattern_of
+
+    :param pattern: packed feedback
+    :param guess: the guess the feedback is for
+    :return: list of tuples like evaluate_guess returns
+    """
+    result = list()
+    for letter in guess:
+        pattern, digit = divmod(int(pattern), 3)
+        result.append((letter, digit != ABSENT, digit == CORRECT))
+    return result
+
+
+def _as_index(word_list):
+    return word_list if isinstance(word_list, WordIndex) else WordIndex(word_list)
+
+
+def feedback_patterns(guess, word_list):
+    """evaluate_guess of one guess against every word of the list as the puzzle
+
+    :param guess: player guess
+    :param word_list: list of strings 5 letters long or its WordIndex
+    :return: numpy array of uint8 packed patterns (see pattern_of), one per word
+    """
+    return feedback_matrix(word_list, [guess])[0]
+
+
+def feedback_matrix(word_list, guesses=None, block=1024):
+    """evaluate_guess of every guess against every word as the puzzle, like
+    evaluate_guess a letter counts as present however many times it occurs
+
+    :param word_list: list of strings 5 letters long or its WordIndex, the puzzles
+    :param guesses: list of strings or WordIndex, the word list if None
+    :param block: number of guesses compared at once
+    :return: numpy array of uint8 packed patterns (see pattern_of) with a row per guess and a column per word
+    """
+    puzzles = _as_index(word_list)
+    guesses = puzzles if guesses is None else _as_index(guesses)
+
+    # tables[i][letter, word] - packed digit of the letter guessed at position i,
+    # so a row of the matrix is the sum of one table row per letter of the guess
+    letters = np.arange(26, dtype=np.uint32)[:, None]
+    present = ((puzzles.masks[None, :] >> letters) & 1).astype(np.uint8)
+    tables = [(present + (puzzles.codes[None, :, i] == letters)) * np.uint8(3 ** i)
+              for i in range(guesses.codes.shape[1])]
+
+    matrix = np.zeros((len(guesses.words), len(puzzles.words)), dtype=np.uint8)
+    for start in range(0, len(guesses.words), block):
+        rows = matrix[start:start + block]
+        for i, table in enumerate(tables):
+            rows += table[guesses.codes[start:start + block, i]]
+    return matrix
+
+
+def load_feedback_matrix(dataset_path, cache_dir=None):
+    """Loads the words of a dataset with their feedback matrix, the matrix is
+    kept on disk keyed by the words and only computed for a new word list
+
+    :param dataset_path: path to txt file
+    :param cache_dir: cache directory, PATTERN_CACHE_DIR next to the dataset by default
+    :return: two values: list of strings 5 letters long, memory-mapped matrix from feedback_matrix
+    """
+    word_list = load_words(dataset_path)
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(dataset_path)), PATTERN_CACHE_DIR)
+    path = os.path.join(cache_dir, hashlib.sha1('\n'.join(word_list).encode()).hexdigest()[:16] + '.npy')
+
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        # written under a temporary name first so a reader never sees half a matrix
+        temp = '{}.{}.tmp.npy'.format(path[:-4], os.getpid())
+        np.save(temp, feedback_matrix(word_list))
+        os.replace(temp, path)
+    return word_list, np.load(path, mmap_mode='r')
+
+
 def get_player_guess(word_list, knowledge) -> list and str:
     """Returns the guess of the simple bot based on the word list and current
     knowledge of the player.
@@ -65,14 +286,7 @@ def get_player_guess(word_list, knowledge) -> list and str:
     :param knowledge: list of tuples, where each tuple has three values
     :return: two values: list of available words after elimination, random guess from the list
     """
-    result = deepcopy(word_list)
-
-    for let, con, pos in knowledge:
-        for word in word_list:
-            if ((pos != -1 and word[pos] != let) or
-                    (con is not None and con != (let in word))):
-                if word in result:
-                    result.remove(word)
+    result = filter_words(word_list, knowledge)
 
     return result, random.choice(result)
 
@@ -106,18 +320,91 @@ def get_smart_player_guess(word_list, knowledge) -> list and str:
     :param knowledge: list of tuples, where each tuple has three values
     :return: two values: list of available words after elimination, random guess from the list
     """
-    result = deepcopy(word_list)
-
-    for let, con, pos in knowledge:
-        for word in word_list:
-            temp = [word[e] for e in pos]
-            if con is not None and con != bool(temp.count(let)):
-                if word in result:
-                    result.remove(word)
+    result = filter_words(word_list, knowledge)
 
     return result, random.choice(result)
 
 
+def _pattern_entropies(patterns, block=64):
+    # entropy in bits of the pattern distribution of every row, the columns
+    # being equally likely puzzles
+    count = patterns.shape[1]
+    sizes = np.arange(count + 1)
+    spread = sizes * np.log2(np.maximum(sizes, 1))
+    entropies = np.empty(len(patterns))
+    for start in range(0, len(patterns), block):
+        rows = np.asarray(patterns[start:start + block]).astype(np.int32)
+        rows += np.arange(len(rows), dtype=np.int32)[:, None] * PATTERN_COUNT
+        counts = np.bincount(rows.ravel(), minlength=len(rows) * PATTERN_COUNT).reshape(len(rows), -1)
+        entropies[start:start + block] = np.log2(count) - spread[counts].sum(axis=1) / count
+    return entropies
+
+
+def get_entropy_player_guess(word_list, knowledge, index=None, matrix=None, memo=None) -> list and str:
+    """Returns the guess of the entropy bot based on the word list and current
+    knowledge of the player.
+    Removes words that cannot be the correct solution like get_player_guess
+    (or get_smart_player_guess for SMART_PLAYER_KNOWLEDGE, WordIndex.filter_constraints
+    for CONSTRAINT_KNOWLEDGE) and guesses the remaining word whose feedback
+    splits the remaining words the most evenly, i.e. with the highest entropy
+    of feedback patterns
+
+    :param word_list: list of strings 5 letters long
+    :param knowledge: structure of PLAYER_KNOWLEDGE, SMART_PLAYER_KNOWLEDGE or CONSTRAINT_KNOWLEDGE
+    :param index: WordIndex of a list containing every word of word_list, e.g. the whole dataset
+    :param matrix: feedback_matrix of the index words, computed for the remaining words when None
+    :param memo: dictionary remembering the guesses for large sets of remaining words (e.g. the first guess),
+     only used together with index
+    :return: two values: list of available words after elimination, guess with the highest entropy
+    """
+    if index is None:
+        index, memo = WordIndex(word_list), None
+    rows = np.array([index.positions[word] for word in word_list], dtype=np.intp)
+    rows = rows[index.filter(knowledge)[rows]]
+    result = [index.words[i] for i in rows]
+
+    key = None
+    if memo is not None and len(rows) >= MEMO_MIN_WORDS:
+        key = rows.tobytes()
+        if key in memo:
+            return result, memo[key]
+
+    if matrix is None:
+        patterns = feedback_matrix(result)
+    else:
+        patterns = _SubMatrix(matrix, rows)
+    guess = result[int(np.argmax(_pattern_entropies(patterns)))]
+    if key is not None:
+        memo[key] = guess
+    return result, guess
+
+
+class _SubMatrix:
+    # rows and columns of a (memory-mapped) matrix taken lazily by row blocks
+    def __init__(self, matrix, rows):
+        self.matrix = matrix
+        self.rows = rows
+        self.shape = (len(rows), len(rows))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, block):
+        return self.matrix[self.rows[block]][:, self.rows]
+
+
+def entropy_guesser(dataset_path, cache_dir=None):
+    """get_entropy_player_guess bound to the cached feedback matrix of a dataset,
+    for the guess_function of main and smart_main
+
+    :param dataset_path: path to txt file
+    :param cache_dir: cache directory of load_feedback_matrix
+    :return: function taking the word list and knowledge
+    """
+    word_list, matrix = load_feedback_matrix(dataset_path, cache_dir)
+    return partial(get_entropy_player_guess, index=WordIndex(word_list), matrix=matrix, memo=dict())
+
+
 def smart_process_result(result, knowledge):
     """Updates the player knowledge based on the feedback for the last guess.
 
@@ -131,11 +418,57 @@ def smart_process_result(result, knowledge):
     for i in range(len(knowledge)):
         for idx, el in enumerate(result):
             if el[0] == knowledge[i][0]:
-                if el[1] and not el[2]:
+                if el[1] and not el[2] and idx in knowledge[i][2]:
                     knowledge[i][2].remove(idx)
                 knowledge[i][1] = el[1]
 
 
+def constraint_process_result(result, knowledge):
+    """Updates the player knowledge based on the feedback for the last guess.
+
+    Keeps everything learned in earlier rounds: a correct letter becomes the
+    only one allowed at its position, a present letter is removed from its
+    position and occurs at least once - or as many times as positions are
+    known to hold it, an absent letter occurs zero times.
+    Touches every position of the guess once (and one pass over the
+    allowed masks), so the update does not depend on the size of the dictionary
+
+    :param result: output from evaluate_guess
+    :param knowledge: structure of CONSTRAINT_KNOWLEDGE
+    :return: has no return value, directly updates knowledge
+    """
+    allowed, low, high = knowledge['allowed'], knowledge['min'], knowledge['max']
+    for idx, (letter, con, pos) in enumerate(result):
+        bit = 1 << (ord(letter) - ord('a'))
+        if pos:
+            allowed[idx] = bit
+        else:
+            allowed[idx] &= ~bit
+            if not con:
+                high[ord(letter) - ord('a')] = 0
+
+    # a position with one allowed letter is known, the letter occurs at least that many times
+    fixed = [0] * len(low)
+    for mask in allowed:
+        if mask and not mask & (mask - 1):
+            fixed[mask.bit_length() - 1] += 1
+    for letter, con, _ in result:
+        code = ord(letter) - ord('a')
+        if con:
+            low[code] = max(low[code], fixed[code], 1)
+
+
+# bots playing the game - initial knowledge, guess function, knowledge update
+STRATEGIES = {
+    'simple': (PLAYER_KNOWLEDGE, get_player_guess, process_result),
+    'smart': (SMART_PLAYER_KNOWLEDGE, get_smart_player_guess, smart_process_result),
+    'entropy': (PLAYER_KNOWLEDGE, get_entropy_player_guess, process_result),
+    'smart_entropy': (SMART_PLAYER_KNOWLEDGE, get_entropy_player_guess, smart_process_result),
+    'constraint': (CONSTRAINT_KNOWLEDGE, get_player_guess, constraint_process_result),
+    'constraint_entropy': (CONSTRAINT_KNOWLEDGE, get_entropy_player_guess, constraint_process_result),
+}
+
+
 # Game
 
 def human_game(dataset_path):
@@ -143,7 +476,7 @@ def human_game(dataset_path):
     puzzle = get_puzzle(word_list)
     print(puzzle)
 
-    for _ in range(6):
+    for _ in range(MAX_GUESSES):
         guess = input("Enter your guess: ")
         while guess not in word_list:
             print("Sorry, I did not find that word!")
@@ -157,46 +490,115 @@ def human_game(dataset_path):
             return
 
 
-def main(dataset_path):
-    word_list = load_words(dataset_path)
-    player_words = word_list.copy()
-    player_knowledge = deepcopy(PLAYER_KNOWLEDGE)
+def play_game(puzzle, word_list, strategy='simple', verbose=False, guess_function=None) -> int:
+    """Lets a bot guess until it finds the puzzle
 
-    puzzle = get_puzzle(word_list)
-    print(puzzle)
+    :param puzzle: secret word
+    :param word_list: list of strings 5 letters long
+    :param strategy: name in STRATEGIES
+    :param verbose: print the available words, the guess and the feedback of every round
+    :param guess_function: replaces the guess function of the strategy, e.g. from entropy_guesser
+    :return: number of guesses
+    """
+    knowledge, default_guess_function, update = STRATEGIES[strategy]
+    guess_function = guess_function or default_guess_function
+    player_words = list(word_list)
+    player_knowledge = deepcopy(knowledge)
 
     guess = ""
+    guesses = 0
     while not is_game_finished(guess, puzzle):
-        player_words, guess = get_player_guess(player_words, player_knowledge)
-        print(player_words)
+        player_words, guess = guess_function(player_words, player_knowledge)
+        if verbose:
+            print(player_words)
         player_words.remove(guess)
-        print(guess)
+        if verbose:
+            print(guess)
 
         result = evaluate_guess(guess, puzzle)
-        print(result)
+        if verbose:
+            print(result)
 
-        process_result(result, player_knowledge)
+        update(result, player_knowledge)
+        guesses += 1
+    return guesses
 
 
-def smart_main(dataset_path):
+def main(dataset_path, guess_function=get_player_guess):
     word_list = load_words(dataset_path)
-    player_words = word_list.copy()
-    player_knowledge = deepcopy(SMART_PLAYER_KNOWLEDGE)
 
     puzzle = get_puzzle(word_list)
     print(puzzle)
 
-    guess = ""
-    while not is_game_finished(guess, puzzle):
-        player_words, guess = get_smart_player_guess(player_words, player_knowledge)
-        print(player_words)
-        player_words.remove(guess)
-        print(guess)
+    play_game(puzzle, word_list, 'simple', verbose=True, guess_function=guess_function)
+
+
+def smart_main(dataset_path, guess_function=get_smart_player_guess):
+    word_list = load_words(dataset_path)
+
+    puzzle = get_puzzle(word_list)
+    print(puzzle)
+
+    play_game(puzzle, word_list, 'smart', verbose=True, guess_function=guess_function)
 
-        result = evaluate_guess(guess, puzzle)
-        print(result)
 
-        smart_process_result(result, player_knowledge)
+# word list and guess function of the games played by this process
+_SIMULATION = dict()
+
+
+def _init_simulation(dataset_path, strategy, cache_dir):
+    random.seed()
+    _SIMULATION['strategy'] = strategy
+    _SIMULATION['guess_function'] = None
+    if STRATEGIES[strategy][1] is get_entropy_player_guess:
+        _SIMULATION['guess_function'] = entropy_guesser(dataset_path, cache_dir)
+    _SIMULATION['words'] = load_words(dataset_path)
+
+
+def _simulate_game(puzzle):
+    return play_game(puzzle, _SIMULATION['words'], _SIMULATION['strategy'],
+                     guess_function=_SIMULATION['guess_function'])
+
+
+def simulate(dataset_path, strategy='simple', games=None, workers=None, seed=None, cache_dir=None) -> dict:
+    """Plays many silent games of a bot over a process pool
+
+    :param dataset_path: path to txt file
+    :param strategy: name in STRATEGIES
+    :param games: number of random puzzles, every word of the dataset once if None
+    :param workers: number of processes, all cores if None, 1 plays in this process
+    :param seed: random seed of the puzzle choice
+    :param cache_dir: cache directory of the feedback matrix used by entropy strategies
+    :return: dictionary with the number of games, guess count distribution, mean number of guesses,
+     fail rate - share of games needing more than MAX_GUESSES guesses, and games per second
+    """
+    word_list = load_words(dataset_path)
+    puzzles = word_list if games is None else random.Random(seed).choices(word_list, k=games)
+    if STRATEGIES[strategy][1] is get_entropy_player_guess:
+        # computed once here so the workers only map the cached file
+        load_feedback_matrix(dataset_path, cache_dir)
+
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_simulation(dataset_path, strategy, cache_dir)
+        guesses = Counter(map(_simulate_game, puzzles))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_simulation,
+                                 initargs=(dataset_path, strategy, cache_dir)) as pool:
+            chunksize = max(1, len(puzzles) // (workers * 8))
+            guesses = Counter(pool.map(_simulate_game, puzzles, chunksize=chunksize))
+    seconds = time.perf_counter() - start
+
+    played = sum(guesses.values())
+    return {
+        'strategy': strategy,
+        'games': played,
+        'distribution': dict(sorted(guesses.items())),
+        'mean': sum(n * count for n, count in guesses.items()) / played if played else 0.0,
+        'fail_rate': sum(count for n, count in guesses.items() if n > MAX_GUESSES) / played if played else 0.0,
+        'games_per_second': played / seconds if seconds else float('inf'),
+    }
 
 
 if __name__ == '__main__':